@@ -11,14 +11,24 @@
 import os
 import sys
 import cv2
-import math
+import numpy as np
 import argparse
+import functools
 import yaml
 import logging
 import time
+import queue
+import threading
 from pathlib import Path
+import torch
 from ultralytics import YOLO
 
+# Usar el parser de libyaml (C) si está disponible; es ~10x más rápido
+try:
+    from yaml import CSafeLoader as YamlLoader
+except ImportError:
+    from yaml import SafeLoader as YamlLoader
+
 # Configurar logging básico
 logging.basicConfig(
     level=logging.INFO,
@@ -34,6 +44,18 @@ DEFAULT_CAMERA_WIDTH = 1280
 DEFAULT_CAMERA_HEIGHT = 720
 DEFAULT_CONFIDENCE = 0.45
 DEFAULT_DATA_YAML = 'dataset_basura/data.yaml'
+DEFAULT_IMGSZ = 640  # Lado de entrada del modelo (múltiplo de 32), independiente de la cámara
+DEFAULT_BATCH_SIZE = 1  # Frames por llamada al modelo (>1 solo compensa en GPU)
+QUEUE_SIZE = 2  # Frames máximos en espera entre etapas del pipeline
+FPS_SMOOTHING = 0.9  # Peso del valor anterior en la media móvil de FPS
+
+# Parámetros de dibujo de las etiquetas
+LABEL_FONT = cv2.FONT_HERSHEY_SIMPLEX  # Mucho más barato de rasterizar que COMPLEX
+LABEL_FONT_SCALE = 0.6
+LABEL_THICKNESS = 1
+
+# Media precisión solo tiene sentido con GPU NVIDIA (en CPU Ultralytics la ignora)
+USE_HALF = torch.cuda.is_available()
 
 
 def parse_arguments():
@@ -54,10 +76,21 @@ def parse_arguments():
                         help=f'Umbral de confianza para detecciones (default: {DEFAULT_CONFIDENCE})')
     parser.add_argument('--data', type=str, default=DEFAULT_DATA_YAML,
                         help=f'Archivo data.yaml con nombres de clases (default: {DEFAULT_DATA_YAML})')
+    parser.add_argument('--imgsz', type=int, default=DEFAULT_IMGSZ,
+                        help=f'Tamaño de entrada para la inferencia (default: {DEFAULT_IMGSZ})')
+    parser.add_argument('--batch', type=int, default=DEFAULT_BATCH_SIZE,
+                        help=f'Máximo de frames por llamada al modelo (default: {DEFAULT_BATCH_SIZE})')
+    parser.add_argument('--draw-all', action='store_true',
+                        help='Dibujar todas las detecciones, no solo la mejor (depuración)')
+    parser.add_argument('--int8', action='store_true',
+                        help='Exportar el engine TensorRT en INT8 (calibrado con las imágenes de --data)')
+    parser.add_argument('--no-export', action='store_true',
+                        help='No exportar a TensorRT/OpenVINO; usar el modelo .pt directamente')
     
     return parser.parse_args()
 
 
+@functools.lru_cache(maxsize=4)
 def load_class_names(yaml_path):
     """
     Carga los nombres de clases desde el archivo data.yaml.
@@ -71,7 +104,7 @@ def load_class_names(yaml_path):
     
     try:
         with open(yaml_path, 'r') as f:
-            data = yaml.safe_load(f)
+            data = yaml.load(f, Loader=YamlLoader)
             if 'names' in data and isinstance(data['names'], list):
                 logger.info(f"Clases cargadas de {yaml_path}: {data['names']}")
                 return data['names']
@@ -89,15 +122,28 @@ def setup_camera(camera_index, width, height):
     Devuelve el objeto de captura o None si falla.
     """
     try:
-        cap = cv2.VideoCapture(camera_index)
+        # Elegir el backend explícitamente en lugar del predeterminado de OpenCV
+        if sys.platform.startswith('linux'):
+            cap = cv2.VideoCapture(camera_index, cv2.CAP_V4L2)
+        elif sys.platform.startswith('win'):
+            cap = cv2.VideoCapture(camera_index, cv2.CAP_DSHOW)
+        else:
+            cap = cv2.VideoCapture(camera_index)
         if not cap.isOpened():
             logger.error(f"No se pudo abrir la cámara con índice {camera_index}")
             return None
         
+        # Pedir MJPG antes de la resolución: reduce mucho el ancho de banda USB
+        # frente a YUYV y permite 30 fps a 1280x720 en USB 2.0
+        cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*'MJPG'))
+        
         # Establecer resolución (puede no funcionar en todas las cámaras)
         cap.set(cv2.CAP_PROP_FRAME_WIDTH, width)
         cap.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
         
+        # Mantener solo el frame más reciente en el buffer del driver
+        cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+        
         # Verificar la resolución real (puede diferir de la solicitada)
         actual_width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
         actual_height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
@@ -110,9 +156,133 @@ def setup_camera(camera_index, width, height):
         return None
 
 
-def load_model(model_path):
+def export_tag(imgsz, batch, precision):
+    """
+    Sufijo con los parámetros de exportación (p. ej. '640_b1_fp16'): un modelo
+    exportado solo se reutiliza si se generó con el mismo tamaño, lote y precisión.
+    """
+    return f"{imgsz}_b{batch}_{precision.lower()}"
+
+
+def export_tensorrt_engine(model_path, imgsz, int8=False, data_yaml=None, batch=1):
+    """
+    Exporta el modelo .pt a un engine TensorRT (FP16 o INT8) junto al original,
+    con los parámetros en el nombre (models/best_640_b1_fp16.engine).
+    Si ese engine ya existe se reutiliza. Devuelve su ruta o None si no es posible.
+    """
+    imgsz = imgsz or DEFAULT_IMGSZ
+    precision = 'INT8' if int8 else 'FP16'
+    model_file = Path(model_path)
+    engine_path = model_file.with_name(f"{model_file.stem}_{export_tag(imgsz, batch, precision)}.engine")
+    if engine_path.exists():
+        logger.info(f"Usando engine TensorRT existente: {engine_path}")
+        return str(engine_path)
+    
+    try:
+        logger.info(f"Exportando {model_path} a TensorRT {precision} (puede tardar varios minutos)...")
+        exported_path = YOLO(model_path).export(
+            format='engine',
+            half=not int8,
+            int8=int8,
+            data=data_yaml if int8 else None,  # Imágenes de calibración para INT8
+            imgsz=imgsz,
+            batch=batch,
+            dynamic=batch > 1,  # Lotes parciales cuando la cámara no llena el batch
+            simplify=True
+        )
+        # Ultralytics siempre escribe models/best.engine: renombrarlo con sus parámetros
+        os.replace(exported_path, engine_path)
+        logger.info(f"Engine TensorRT generado en {engine_path}")
+        return str(engine_path)
+    
+    except Exception as e:
+        logger.warning(f"No se pudo exportar a TensorRT, se usará el modelo original: {e}")
+        return None
+
+
+def export_openvino_model(model_path, imgsz, data_yaml=None, batch=1):
+    """
+    Exporta el modelo .pt a OpenVINO para despliegues solo-CPU.
+    Usa INT8 si hay un data.yaml para calibrar; si no, FP32.
+    El directorio lleva los parámetros en el nombre (models/best_640_b1_int8_openvino_model)
+    y solo se reutiliza si coinciden. Devuelve su ruta o None.
+    """
+    imgsz = imgsz or DEFAULT_IMGSZ
+    int8 = data_yaml is not None and os.path.exists(data_yaml)
+    precision = 'INT8' if int8 else 'FP32'
+    model_file = Path(model_path)
+    openvino_dir = model_file.with_name(f"{model_file.stem}_{export_tag(imgsz, batch, precision)}_openvino_model")
+    if openvino_dir.is_dir():
+        logger.info(f"Usando modelo OpenVINO existente: {openvino_dir}")
+        return str(openvino_dir)
+    
+    try:
+        logger.info(f"Exportando {model_path} a OpenVINO {precision} (puede tardar varios minutos)...")
+        exported_path = YOLO(model_path).export(
+            format='openvino',
+            int8=int8,
+            data=data_yaml if int8 else None,  # Imágenes de calibración para INT8
+            imgsz=imgsz,
+            batch=batch,
+            dynamic=batch > 1  # Lotes parciales cuando la cámara no llena el batch
+        )
+        # Ultralytics escribe models/best[_int8]_openvino_model: renombrarlo con sus parámetros
+        os.replace(exported_path, openvino_dir)
+        logger.info(f"Modelo OpenVINO generado en {openvino_dir}")
+        return str(openvino_dir)
+    
+    except Exception as e:
+        logger.warning(f"No se pudo exportar a OpenVINO, se usará el modelo original: {e}")
+        return None
+
+
+def optimize_torch_model(model, imgsz, warmup_iters=3):
+    """
+    Fusiona Conv+BN del modelo PyTorch y, si hay GPU, lo compila con torch.compile.
+    Hace unas inferencias de calentamiento para que el coste de compilación
+    no recaiga en el primer frame real.
+    """
+    try:
+        model.fuse()
+        
+        # La primera inferencia crea el predictor, cuyo AutoBackend vuelve a llamar a
+        # fuse() sobre el modelo: si se compilara antes, ese fuse() devolvería el
+        # módulo original sin compilar. Por eso se compila el modelo del predictor
+        dummy_frame = np.zeros((imgsz, imgsz, 3), dtype=np.uint8)
+        model.predict(dummy_frame, imgsz=imgsz, half=USE_HALF, verbose=False)
+        
+        if torch.cuda.is_available():
+            logger.info("Compilando modelo con torch.compile (reduce-overhead)...")
+            backend = model.predictor.model
+            backend.model = torch.compile(backend.model, mode='reduce-overhead', fullgraph=False)
+        
+        for _ in range(warmup_iters):
+            model.predict(dummy_frame, imgsz=imgsz, half=USE_HALF, verbose=False)
+        
+        if torch.cuda.is_available():
+            # Un módulo compilado (OptimizedModule) conserva el original en _orig_mod
+            if hasattr(model.predictor.model.model, '_orig_mod'):
+                logger.info("El predictor usa el modelo compilado con torch.compile")
+            else:
+                logger.warning("El predictor no usa el modelo compilado; se ejecuta sin compilar")
+        logger.info("Modelo optimizado y calentado")
+    
+    except Exception as e:
+        logger.warning(f"No se pudo optimizar el modelo PyTorch, se usará sin compilar: {e}")
+        # Si falló la compilación, devolver al predictor el módulo original
+        backend = getattr(model.predictor, 'model', None)
+        if backend is not None and hasattr(backend.model, '_orig_mod'):
+            backend.model = backend.model._orig_mod
+
+    return model
+
+
+def load_model(model_path, imgsz=None, int8=False, data_yaml=None, export=True, batch=1):
     """
     Carga el modelo YOLO desde la ruta especificada.
+    Si hay GPU NVIDIA, exporta/carga un engine TensorRT equivalente al .pt;
+    en caso contrario, un modelo OpenVINO para CPU. Si se usa el .pt,
+    se fusiona y compila una sola vez aquí.
     Devuelve el modelo o None si falla.
     """
     if not os.path.exists(model_path):
@@ -120,17 +290,246 @@ def load_model(model_path):
         return None
     
     try:
+        if export and model_path.endswith('.pt'):
+            if torch.cuda.is_available():
+                exported_path = export_tensorrt_engine(model_path, imgsz, int8, data_yaml, batch)
+            else:
+                exported_path = export_openvino_model(model_path, imgsz, data_yaml, batch)
+            
+            if exported_path:
+                logger.info(f"Cargando modelo exportado desde {exported_path}...")
+                model = YOLO(exported_path, task='detect')
+                logger.info("Modelo cargado correctamente")
+                return model
+        
         logger.info(f"Cargando modelo desde {model_path}...")
         model = YOLO(model_path)
         logger.info("Modelo cargado correctamente")
-        return model
+        return optimize_torch_model(model, imgsz or DEFAULT_IMGSZ)
     
     except Exception as e:
         logger.error(f"Error al cargar el modelo: {e}")
         return None
 
 
-def process_frame(frame, model, class_names, min_confidence):
+def resize_for_inference(frame, imgsz):
+    """
+    Reduce el frame al tamaño de inferencia (la GUI conserva la resolución completa).
+    Devuelve el frame reducido y el factor para reescalar las cajas al original.
+    """
+    height, width = frame.shape[:2]
+    if width > imgsz:
+        frame_small = cv2.resize(frame, (imgsz, imgsz * height // width), interpolation=cv2.INTER_AREA)
+        return frame_small, width / imgsz
+    return frame, 1.0
+
+
+@functools.lru_cache(maxsize=512)
+def get_label_size(label_text):
+    """
+    Devuelve (ancho, alto, baseline) de una etiqueta.
+    Memoizado: con 4 clases y porcentajes enteros hay como mucho ~400 etiquetas.
+    """
+    (text_width, text_height), baseline = cv2.getTextSize(
+        label_text, LABEL_FONT, LABEL_FONT_SCALE, LABEL_THICKNESS
+    )
+    return text_width, text_height, baseline
+
+
+def annotate_result(annotated_frame, res, scale, class_names, min_confidence, draw_all=False, offset=(0, 0)):
+    """
+    Filtra las cajas de un resultado de YOLO y dibuja la mejor sobre el frame
+    (o todas si `draw_all` es True). `offset` es la posición (x, y) del frame
+    reducido dentro de la entrada del modelo cuando se centró con relleno.
+    Devuelve la mejor detección (mayor confianza) o None.
+    """
+    boxes = res.boxes
+    if boxes is None or len(boxes) == 0:
+        return None
+    
+    height, width = annotated_frame.shape[:2]
+    
+    # Extraer todos los tensores de una vez (evita accesos por caja)
+    left, top = offset
+    xyxy = (boxes.xyxy.cpu().numpy() - [left, top, left, top]) * scale  # Coordenadas en la resolución original
+    confs = boxes.conf.cpu().numpy()
+    cls_idxs = boxes.cls.cpu().numpy().astype(np.int32)
+    
+    # Filtrar por umbral de confianza
+    mask = confs >= min_confidence
+    
+    # Descartar índices de clase inválidos
+    invalid = mask & ((cls_idxs < 0) | (cls_idxs >= len(class_names)))
+    if invalid.any():
+        logger.warning(f"Índices de clase inválidos: {cls_idxs[invalid].tolist()}")
+        mask &= ~invalid
+    
+    if not mask.any():
+        return None
+    
+    # Asegurar que las coordenadas estén dentro de los límites del frame
+    xyxy = np.clip(xyxy[mask], 0, [width - 1, height - 1, width - 1, height - 1]).astype(np.int32)
+    confs = confs[mask]
+    cls_idxs = cls_idxs[mask]
+    
+    # Guardar la mejor detección (mayor confianza)
+    best = int(confs.argmax())
+    best_detection = {
+        'box': tuple(xyxy[best].tolist()),
+        'conf': float(confs[best]),
+        'cls_idx': int(cls_idxs[best]),
+        'cls_name': class_names[cls_idxs[best]]
+    }
+    
+    # Por defecto solo se dibuja la mejor detección, que es la que se clasifica
+    if not draw_all:
+        xyxy = xyxy[best:best + 1]
+        confs = confs[best:best + 1]
+        cls_idxs = cls_idxs[best:best + 1]
+    
+    for (x1, y1, x2, y2), conf, cls_idx in zip(xyxy.tolist(), confs.tolist(), cls_idxs.tolist()):
+        cls_name = class_names[cls_idx]
+        
+        # Dibujar bounding box y etiqueta
+        color = (0, 0, 255)  # Rojo (BGR)
+        cv2.rectangle(annotated_frame, (x1, y1), (x2, y2), color, 2)
+        
+        # Preparar texto de etiqueta
+        label_text = f'{cls_name} {int(conf * 100)}%'
+        
+        # Dibujar fondo para el texto
+        text_width, text_height, baseline = get_label_size(label_text)
+        cv2.rectangle(
+            annotated_frame, 
+            (x1, y1 - text_height - baseline - 5), 
+            (x1 + text_width, y1), 
+            (0, 0, 0), 
+            -1
+        )
+        
+        # Dibujar texto
+        cv2.putText(
+            annotated_frame, 
+            label_text, 
+            (x1, y1 - baseline - 2), 
+            LABEL_FONT, 
+            LABEL_FONT_SCALE, 
+            color, 
+            LABEL_THICKNESS
+        )
+    
+    return best_detection
+
+
+class CudaInputStager:
+    """
+    Prepara la entrada del modelo directamente en la GPU.
+    Los frames reducidos se copian a un buffer en memoria pinned y la
+    conversión uint8 -> FP16 / 255 se hace en CUDA, en lugar del
+    preprocesado en CPU que Ultralytics repite en cada llamada.
+    Los buffers se reservan una vez y se reutilizan mientras no cambie la forma.
+    
+    Como el tensor no pasa por el LetterBox de Ultralytics, el relleno se hace
+    aquí igual que en el entrenamiento: frame centrado sobre gris 114.
+    """
+    PAD_VALUE = 114  # Gris del relleno del LetterBox de YOLO
+    
+    def __init__(self):
+        self.pinned = None
+        self.gpu = None
+        self._frame_shapes = None  # Formas de los frames copiados en pinned (el resto es relleno)
+    
+    def __call__(self, frames_small, imgsz):
+        """
+        Devuelve (tensor CUDA FP16 (N, 3, imgsz, imgsz) en RGB normalizado,
+        lista de desplazamientos (x, y) de cada frame dentro del tensor),
+        o None si algún frame no cabe en el tamaño de inferencia.
+        """
+        if any(f.shape[0] > imgsz or f.shape[1] > imgsz for f in frames_small):
+            return None
+        
+        shape = (len(frames_small), 3, imgsz, imgsz)
+        if self.pinned is None or tuple(self.pinned.shape) != shape:
+            self.pinned = torch.empty(shape, dtype=torch.uint8).pin_memory()
+            self.gpu = torch.empty(shape, dtype=torch.float16, device='cuda')
+            self._frame_shapes = None
+        
+        # El relleno solo hay que rehacerlo si cambia el tamaño de los frames
+        frame_shapes = [f.shape[:2] for f in frames_small]
+        if frame_shapes != self._frame_shapes:
+            self.pinned.fill_(self.PAD_VALUE)
+            self._frame_shapes = frame_shapes
+        
+        # Copiar cada frame centrado (como el LetterBox de Ultralytics),
+        # pasando de HWC BGR a CHW RGB sin copias intermedias en NumPy
+        offsets = []
+        for i, frame_small in enumerate(frames_small):
+            height, width = frame_small.shape[:2]
+            top, left = (imgsz - height) // 2, (imgsz - width) // 2
+            for channel in range(3):
+                self.pinned[i, channel, top:top + height, left:left + width].copy_(
+                    torch.from_numpy(frame_small[:, :, 2 - channel])
+                )
+            offsets.append((left, top))
+        
+        self.gpu.copy_(self.pinned, non_blocking=True)
+        self.gpu.div_(255)
+        return self.gpu, offsets
+
+
+# Solo se usa con GPU NVIDIA; en CPU se deja el preprocesado a Ultralytics
+cuda_input_stager = CudaInputStager() if USE_HALF else None
+
+
+def process_frames(frames, model, class_names, min_confidence, imgsz=DEFAULT_IMGSZ, draw_all=False):
+    """
+    Procesa un lote de frames con una sola llamada al modelo YOLO.
+    La inferencia se hace sobre copias reducidas a `imgsz` de ancho y las
+    cajas se reescalan a la resolución original para dibujar.
+    Devuelve una lista de (frame con anotaciones, mejor detección).
+    """
+    if not frames or model is None:
+        return [(frame, None) for frame in frames]
+    
+    try:
+        resized = [resize_for_inference(frame, imgsz) for frame in frames]
+        frames_small = [small for small, _ in resized]
+        
+        # Con GPU, entregar al modelo un tensor CUDA FP16 ya normalizado y con
+        # relleno; las cajas vienen entonces desplazadas por el centrado de cada frame
+        staged = None
+        if cuda_input_stager is not None:
+            staged = cuda_input_stager(frames_small, imgsz)
+        if staged is not None:
+            model_input, offsets = staged
+        else:
+            model_input, offsets = frames_small, [(0, 0)] * len(frames_small)
+        
+        # Inferencia (predict devuelve una lista con un resultado por frame)
+        results = model.predict(model_input, imgsz=imgsz, half=USE_HALF, verbose=False)
+        
+        # Dibujar directamente sobre cada frame: cada cap.read() devuelve un array
+        # nuevo que pertenece a esta iteración, así que no hace falta copiarlo
+        processed = []
+        for frame, (_, scale), offset, res in zip(frames, resized, offsets, results):
+            best_detection = annotate_result(frame, res, scale, class_names, min_confidence, draw_all, offset)
+            
+            # Mostrar información de la mejor detección (solo para depuración)
+            if best_detection:
+                logger.debug(
+                    f"Mejor detección: {best_detection['cls_name']} "
+                    f"(Conf: {best_detection['conf']:.2f})"
+                )
+            processed.append((frame, best_detection))
+        
+        return processed
+    
+    except Exception as e:
+        logger.error(f"Error procesando frames: {e}")
+        return [(frame, None) for frame in frames]
+
+
+def process_frame(frame, model, class_names, min_confidence, imgsz=DEFAULT_IMGSZ, draw_all=False):
     """
     Procesa un frame con el modelo YOLO.
     Devuelve el frame con anotaciones y la mejor detección.
@@ -138,106 +537,115 @@ def process_frame(frame, model, class_names, min_confidence):
     if frame is None or model is None:
         return frame, None
     
-    # Hacer una copia del frame original
-    annotated_frame = frame.copy()
-    best_detection = None
+    return process_frames([frame], model, class_names, min_confidence, imgsz, draw_all)[0]
+
+
+def update_fps(fps, frame_interval):
+    """
+    Actualiza los FPS con una media móvil exponencial a partir del tiempo
+    entre frames consecutivos (medido con time.perf_counter).
+    """
+    if frame_interval <= 0:
+        return fps
+    if fps == 0:
+        return 1.0 / frame_interval
+    return FPS_SMOOTHING * fps + (1 - FPS_SMOOTHING) / frame_interval
+
+
+def put_latest(q, item):
+    """
+    Inserta un elemento en una cola acotada sin bloquear.
+    Si la cola está llena descarta el más antiguo, para que el consumidor
+    trabaje siempre con el frame más reciente.
+    """
+    while True:
+        try:
+            q.put_nowait(item)
+            return
+        except queue.Full:
+            try:
+                q.get_nowait()
+            except queue.Empty:
+                pass
+
+
+def capture_worker(cap, args, frame_queue, stop_event):
+    """
+    Hilo lector: captura frames de la cámara y los publica en `frame_queue`.
+    Se encarga también de reconectar la cámara y de liberarla al terminar.
+    """
+    try:
+        while not stop_event.is_set():
+            ret, frame = cap.read()
+            if not ret:
+                logger.error("Error al capturar frame. Comprueba la conexión de la cámara.")
+                # Intentar reconectarse a la cámara
+                cap.release()
+                time.sleep(1.0)
+                cap = setup_camera(args.camera, args.width, args.height)
+                if cap is None:
+                    stop_event.set()
+                    break
+                continue
+            
+            put_latest(frame_queue, frame)
+    
+    except Exception as e:
+        logger.error(f"Error en hilo de captura: {e}")
+        stop_event.set()
+    
+    finally:
+        if cap is not None:
+            cap.release()
+
+
+def display_worker(window_name, display_queue, stop_event):
+    """
+    Hilo de visualización: superpone los FPS, muestra los frames anotados
+    y atiende el teclado.
+    """
+    fps = 0.0
+    last_frame_time = time.perf_counter()
     
     try:
-        # Inferencia
-        results = model(frame, stream=True, verbose=False)
+        cv2.namedWindow(window_name, cv2.WINDOW_NORMAL)
         
-        for res in results:
-            boxes = res.boxes
-            for box in boxes:
-                # Obtener confianza
-                conf = float(box.conf[0])
-                
-                # Filtrar por umbral de confianza
-                if conf < min_confidence:
-                    continue
-                
-                # Obtener índice de clase
-                cls_idx = int(box.cls[0])
-                
-                # Verificar si el índice de clase es válido
-                if cls_idx < 0 or cls_idx >= len(class_names):
-                    logger.warning(f"Índice de clase inválido: {cls_idx}")
-                    continue
-                
-                # Obtener clase
-                cls_name = class_names[cls_idx]
-                
-                # Obtener coordenadas del bounding box
-                x1, y1, x2, y2 = map(int, box.xyxy[0])
-                
-                # Asegurar que las coordenadas estén dentro de los límites del frame
-                height, width = frame.shape[:2]
-                x1 = max(0, min(x1, width - 1))
-                y1 = max(0, min(y1, height - 1))
-                x2 = max(0, min(x2, width - 1))
-                y2 = max(0, min(y2, height - 1))
-                
-                # Guardar la mejor detección (mayor confianza)
-                if best_detection is None or conf > best_detection['conf']:
-                    best_detection = {
-                        'box': (x1, y1, x2, y2),
-                        'conf': conf,
-                        'cls_idx': cls_idx,
-                        'cls_name': cls_name
-                    }
-                
-                # Dibujar bounding box y etiqueta
-                color = (0, 0, 255)  # Rojo (BGR)
-                cv2.rectangle(annotated_frame, (x1, y1), (x2, y2), color, 2)
-                
-                # Preparar texto de etiqueta
-                label_text = f'{cls_name} {int(conf * 100)}%'
-                
-                # Dibujar fondo para el texto
-                (text_width, text_height), baseline = cv2.getTextSize(
-                    label_text, cv2.FONT_HERSHEY_COMPLEX, 1, 2
-                )
-                cv2.rectangle(
-                    annotated_frame, 
-                    (x1, y1 - 20 - text_height), 
-                    (x1 + text_width, y1), 
-                    (0, 0, 0), 
-                    -1
-                )
+        while not stop_event.is_set():
+            try:
+                annotated_frame = display_queue.get(timeout=0.1)
+            except queue.Empty:
+                annotated_frame = None
+            
+            if annotated_frame is not None:
+                # Calcular FPS con una media móvil en cada frame
+                now = time.perf_counter()
+                fps = update_fps(fps, now - last_frame_time)
+                last_frame_time = now
                 
-                # Dibujar texto
+                # Mostrar FPS en el frame
                 cv2.putText(
-                    annotated_frame, 
-                    label_text, 
-                    (x1, y1 - 20), 
-                    cv2.FONT_HERSHEY_COMPLEX, 
-                    1, 
-                    color, 
+                    annotated_frame,
+                    f"FPS: {fps:.1f}",
+                    (10, 30),
+                    cv2.FONT_HERSHEY_SIMPLEX,
+                    1,
+                    (0, 255, 0),  # Verde
                     2
                 )
-        
-        # Mostrar información de la mejor detección (solo para depuración)
-        if best_detection:
-            logger.debug(
-                f"Mejor detección: {best_detection['cls_name']} "
-                f"(Conf: {best_detection['conf']:.2f})"
-            )
-        
-        return annotated_frame, best_detection
+                cv2.imshow(window_name, annotated_frame)
+            
+            # Comprobar tecla presionada (ESC o q para salir)
+            key = cv2.waitKey(1)
+            if key == 27 or key == ord('q'):  # ESC o 'q'
+                logger.info("Saliendo por petición del usuario.")
+                stop_event.set()
     
     except Exception as e:
-        logger.error(f"Error procesando frame: {e}")
-        return frame, None
-
-
-def calculate_fps(start_time, frame_count):
-    """
-    Calcula los FPS basado en el tiempo transcurrido y el número de frames.
-    """
-    elapsed_time = time.time() - start_time
-    if elapsed_time > 0:
-        return frame_count / elapsed_time
-    return 0
+        logger.error(f"Error en hilo de visualización: {e}")
+        stop_event.set()
+    
+    finally:
+        cv2.destroyAllWindows()
 
 
 def main():
@@ -249,7 +657,14 @@ def main():
     class_names = load_class_names(args.data)
     
     # Cargar modelo YOLOv8
-    model = load_model(args.model)
+    model = load_model(
+        args.model,
+        imgsz=args.imgsz,
+        int8=args.int8,
+        data_yaml=args.data,
+        export=not args.no_export,
+        batch=args.batch
+    )
     if model is None:
         return 1
     
@@ -258,61 +673,46 @@ def main():
     if cap is None:
         return 1
     
-    # Variables para mostrar FPS
-    start_time = time.time()
-    frame_count = 0
-    fps = 0
+    # Pipeline: captura -> inferencia (hilo principal) -> visualización
+    queue_size = max(QUEUE_SIZE, args.batch)
+    frame_queue = queue.Queue(maxsize=queue_size)
+    display_queue = queue.Queue(maxsize=queue_size)
+    stop_event = threading.Event()
     
-    # Crear ventana
-    window_name = "Waste Detect"
-    cv2.namedWindow(window_name, cv2.WINDOW_NORMAL)
+    capture_thread = threading.Thread(
+        target=capture_worker,
+        args=(cap, args, frame_queue, stop_event),
+        daemon=True
+    )
+    display_thread = threading.Thread(
+        target=display_worker,
+        args=("Waste Detect", display_queue, stop_event),
+        daemon=True
+    )
+    capture_thread.start()
+    display_thread.start()
     
     logger.info("Iniciando bucle de detección. Presiona 'ESC' o 'q' para salir.")
     
     try:
         # Bucle principal
-        while True:
-            # Capturar frame
-            ret, frame = cap.read()
-            if not ret:
-                logger.error("Error al capturar frame. Comprueba la conexión de la cámara.")
-                # Intentar reconectarse a la cámara
-                time.sleep(1.0)
-                cap = setup_camera(args.camera, args.width, args.height)
-                if cap is None:
-                    break
+        while not stop_event.is_set():
+            # Esperar el primer frame y completar el lote con los que ya estén listos
+            # (si la cámara es lenta, el lote se queda en un solo frame)
+            try:
+                frames = [frame_queue.get(timeout=0.1)]
+            except queue.Empty:
                 continue
+            while len(frames) < args.batch:
+                try:
+                    frames.append(frame_queue.get_nowait())
+                except queue.Empty:
+                    break
             
-            # Procesar frame
-            annotated_frame, detection = process_frame(frame, model, class_names, args.conf)
-            
-            # Calcular FPS cada 10 frames
-            frame_count += 1
-            if frame_count % 10 == 0:
-                fps = calculate_fps(start_time, frame_count)
-                # Resetear para el siguiente cálculo
-                start_time = time.time()
-                frame_count = 0
-            
-            # Mostrar FPS en el frame
-            cv2.putText(
-                annotated_frame,
-                f"FPS: {fps:.1f}",
-                (10, 30),
-                cv2.FONT_HERSHEY_SIMPLEX,
-                1,
-                (0, 255, 0),  # Verde
-                2
-            )
-            
-            # Mostrar el frame
-            cv2.imshow(window_name, annotated_frame)
-            
-            # Comprobar tecla presionada (ESC o q para salir)
-            key = cv2.waitKey(1)
-            if key == 27 or key == ord('q'):  # ESC o 'q'
-                logger.info("Saliendo por petición del usuario.")
-                break
+            # Procesar el lote
+            for annotated_frame, detection in process_frames(frames, model, class_names, args.conf, args.imgsz, args.draw_all):
+                # Enviar el frame al hilo de visualización
+                put_latest(display_queue, annotated_frame)
     
     except KeyboardInterrupt:
         logger.info("Interrupción por teclado (Ctrl+C). Saliendo...")
@@ -321,10 +721,10 @@ def main():
         logger.error(f"Error inesperado: {e}")
     
     finally:
-        # Liberar recursos
-        if cap is not None:
-            cap.release()
-        cv2.destroyAllWindows()
+        # Detener los hilos; cada uno libera sus propios recursos
+        stop_event.set()
+        capture_thread.join(timeout=2.0)
+        display_thread.join(timeout=2.0)
         logger.info("Recursos liberados. Programa finalizado.")
     
     return 0
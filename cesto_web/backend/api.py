@@ -1,10 +1,45 @@
-from flask import Blueprint, jsonify
+from flask import Blueprint, Response
 from datetime import datetime
+import threading
+import orjson
+from cachetools import TTLCache
+import config
 import database
 
 # Crear un Blueprint para las rutas de la API
 api_bp = Blueprint('api', __name__, url_prefix='/api')
 
+# Valores por defecto cuando aún no hay datos (solo lectura, no modificar)
+_DEFAULT_FILL = {'Metal': 0.0, 'Glass': 0.0, 'Plastic': 0.0, 'Carton': 0.0}
+_DEFAULT_STATS = {waste_type: 0 for waste_type in _DEFAULT_FILL}
+
+# Caché de corta duración para las consultas a la base de datos: los datos solo
+# cambian cada UPDATE_INTERVAL segundos, así que las peticiones de varios clientes
+# dentro de la ventana comparten el mismo resultado
+_query_cache = TTLCache(maxsize=8, ttl=config.API_CACHE_TTL)
+_query_cache_lock = threading.Lock()
+
+def cached_query(method_name):
+    """
+    Ejecuta un método de lectura de la base de datos usando la caché TTL.
+    Devuelve una copia para que los handlers puedan modificar el resultado.
+    """
+    with _query_cache_lock:
+        result = _query_cache.get(method_name)
+    
+    if result is None:
+        db = database.get_db()
+        result = getattr(db, method_name)()
+        with _query_cache_lock:
+            _query_cache[method_name] = result
+    
+    return dict(result)
+
+def invalidate_cache():
+    """Vacía la caché de consultas (llamar tras escribir datos nuevos)."""
+    with _query_cache_lock:
+        _query_cache.clear()
+
 # Formatear timestamp para JSON
 def format_timestamp(timestamp):
     if timestamp is None:
@@ -13,22 +48,17 @@ def format_timestamp(timestamp):
         return timestamp.isoformat()
     return timestamp
 
+# Serializar respuestas con orjson (más rápido que jsonify)
+def json_response(payload, status=200):
+    return Response(orjson.dumps(payload), status=status, mimetype='application/json')
+
 # Ruta para obtener los niveles de llenado de todos los compartimentos
 @api_bp.route('/fill-levels', methods=['GET'])
 def get_fill_levels():
-    db = database.get_db()
-    levels = db.get_latest_fill_levels()
-    
     # Si no hay datos, devolver valores por defecto
-    if not levels:
-        levels = {
-            'Metal': 0.0,
-            'Glass': 0.0,
-            'Plastic': 0.0,
-            'Carton': 0.0
-        }
+    levels = cached_query('get_latest_fill_levels') or _DEFAULT_FILL
     
-    return jsonify({
+    return json_response({
         'success': True,
         'data': levels,
         'timestamp': format_timestamp(datetime.now())
@@ -37,19 +67,10 @@ def get_fill_levels():
 # Ruta para obtener las estadísticas de clasificación
 @api_bp.route('/statistics', methods=['GET'])
 def get_statistics():
-    db = database.get_db()
-    stats = db.get_statistics()
-    
     # Si no hay datos, devolver valores por defecto
-    if not stats:
-        stats = {
-            'Metal': 0,
-            'Glass': 0,
-            'Plastic': 0,
-            'Carton': 0
-        }
+    stats = cached_query('get_statistics') or _DEFAULT_STATS
     
-    return jsonify({
+    return json_response({
         'success': True,
         'data': stats,
         'timestamp': format_timestamp(datetime.now())
@@ -65,7 +86,7 @@ def get_system_status():
     if 'timestamp' in status:
         status['timestamp'] = format_timestamp(status['timestamp'])
     
-    return jsonify({
+    return json_response({
         'success': True,
         'data': status
     })
@@ -73,33 +94,18 @@ def get_system_status():
 # Ruta para obtener todos los datos del sistema (dashboard)
 @api_bp.route('/dashboard', methods=['GET'])
 def get_dashboard_data():
-    db = database.get_db()
-    
     # Obtener todos los datos relevantes
-    fill_levels = db.get_latest_fill_levels()
-    statistics = db.get_statistics()
-    system_status = db.get_system_status()
+    fill_levels = cached_query('get_latest_fill_levels')
+    statistics = cached_query('get_statistics')
+    system_status = cached_query('get_system_status')
     
     # Formatear timestamp del estado del sistema
     if 'timestamp' in system_status:
         system_status['timestamp'] = format_timestamp(system_status['timestamp'])
     
     # Si no hay datos, proporcionar valores por defecto
-    if not fill_levels:
-        fill_levels = {
-            'Metal': 0.0,
-            'Glass': 0.0,
-            'Plastic': 0.0,
-            'Carton': 0.0
-        }
-    
-    if not statistics:
-        statistics = {
-            'Metal': 0,
-            'Glass': 0,
-            'Plastic': 0,
-            'Carton': 0
-        }
+    fill_levels = fill_levels or _DEFAULT_FILL
+    statistics = statistics or _DEFAULT_STATS
     
     # Calcular totales
     total_items = sum(statistics.values())
@@ -118,4 +124,4 @@ def get_dashboard_data():
         'timestamp': format_timestamp(datetime.now())
     }
     
-    return jsonify(response) 
\ No newline at end of file
+    return json_response(response) 
\ No newline at end of file
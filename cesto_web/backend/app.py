@@ -6,20 +6,27 @@ Autor(es): Gabriel Calderón, Elias Bautista, Cristian Hernandez
 Fecha: Abril de 2024
 """
 
+# eventlet debe parchear la librería estándar antes de importar cualquier otro módulo
+import eventlet
+eventlet.monkey_patch()
+
 import os
+import select
 import socket
+import struct
 import json
 import threading
 import time
 import logging
-from flask import Flask, render_template, jsonify
-from flask_socketio import SocketIO
-import requests
+import orjson
+from flask import Flask, render_template, jsonify, request
+from flask_compress import Compress
+from flask_socketio import SocketIO, emit
 
 # Importar módulos del proyecto
 import config
 import database
-from api import api_bp
+from api import api_bp, cached_query, invalidate_cache
 
 # Configurar logging
 logging.basicConfig(
@@ -33,9 +40,23 @@ logger = logging.getLogger('app')
 app = Flask(__name__)
 app.config['SECRET_KEY'] = config.SECRET_KEY
 app.config['DEBUG'] = config.DEBUG
+# Permitir que el navegador cachee los archivos estáticos
+app.config['SEND_FILE_MAX_AGE_DEFAULT'] = config.STATIC_MAX_AGE
+# Comprimir con gzip las respuestas de la API (y HTML/estáticos) a partir de COMPRESSION_THRESHOLD
+app.config['COMPRESS_ALGORITHM'] = 'gzip'
+app.config['COMPRESS_MIN_SIZE'] = config.COMPRESSION_THRESHOLD
+Compress(app)
 
 # Inicializar SocketIO para comunicaciones en tiempo real
-socketio = SocketIO(app, cors_allowed_origins="*", async_mode='eventlet')
+# (servidor eventlet, con compresión de mensajes a partir de COMPRESSION_THRESHOLD)
+socketio = SocketIO(
+    app,
+    cors_allowed_origins="*",
+    async_mode='eventlet',
+    http_compression=True,
+    compression_threshold=config.COMPRESSION_THRESHOLD,
+    engineio_logger=False
+)
 
 # Registrar blueprint de la API
 app.register_blueprint(api_bp)
@@ -56,55 +77,115 @@ def index():
 def page_not_found(e):
     return jsonify({"error": "Ruta no encontrada", "status": 404}), 404
 
-# Función para obtener datos del script main.py
-def get_data_from_main():
+# Las respuestas de main.py van precedidas de su longitud (4 bytes, big-endian)
+LENGTH_PREFIX = struct.Struct('>I')
+
+def _recv_exact(sock, num_bytes, timeout):
     """
-    Intenta obtener datos del script main.py
-    El script main.py debería exponer un servidor de sockets simple que devuelva
-    JSON con los datos actuales del sistema.
+    Lee exactamente `num_bytes` del socket en un buffer preasignado.
+    `timeout` limita el tiempo total de la lectura (no el de cada recv).
+    Lanza ConnectionResetError si main.py cierra la conexión antes de completar la lectura.
     """
-    try:
-        # Crear un socket cliente
-        client_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        client_socket.settimeout(5)  # Timeout de 5 segundos
+    buffer = bytearray(num_bytes)
+    view = memoryview(buffer)
+    received = 0
+    deadline = time.monotonic() + timeout
+    while received < num_bytes:
+        remaining = deadline - time.monotonic()
+        ready, _, _ = select.select([sock], [], [], max(remaining, 0))
+        if not ready:
+            raise socket.timeout("Timeout esperando respuesta de main.py")
+        count = sock.recv_into(view[received:], num_bytes - received)
+        if count == 0:
+            raise ConnectionResetError("Conexión cerrada por main.py antes de completar el mensaje")
+        received += count
+    return buffer
+
+class MainPyClient:
+    """
+    Cliente del adaptador web de main.py.
+    Mantiene una conexión TCP persistente entre consultas y solo reconecta
+    cuando main.py la cierra.
+    """
+    def __init__(self, host, port, timeout=5):
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self._sock = None
+
+    def _connect(self):
+        """Abre la conexión con main.py."""
+        sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._sock = sock
+
+    def close(self):
+        """Cierra la conexión (la siguiente consulta vuelve a conectar)."""
+        if self._sock is not None:
+            try:
+                self._sock.close()
+            except OSError:
+                pass
+            self._sock = None
+
+    def _request(self):
+        """Envía GET_DATA por la conexión persistente y devuelve la respuesta en bytes."""
+        if self._sock is None:
+            self._connect()
         
-        # Conectar al servidor en main.py
-        client_socket.connect((config.MAIN_PY_HOST, config.MAIN_PY_PORT))
+        # Un comando por línea sobre la misma conexión
+        self._sock.sendall(b'GET_DATA\n')
         
-        # Enviar comando para solicitar datos
-        client_socket.send(b'GET_DATA')
+        # Recibir respuesta: primero la longitud y luego exactamente ese número de bytes
+        header = _recv_exact(self._sock, LENGTH_PREFIX.size, self.timeout)
+        (length,) = LENGTH_PREFIX.unpack(header)
+        return _recv_exact(self._sock, length, self.timeout)
+
+    def get_data(self):
+        """
+        Obtiene los datos actuales de main.py.
         
-        # Recibir respuesta
-        response = b''
-        chunk = client_socket.recv(4096)
-        while chunk:
-            response += chunk
+        Returns:
+            tuple: (datos, None) si tuvo éxito o (None, mensaje de error)
+        """
+        try:
             try:
-                # Intentar recibir más datos con un timeout corto
-                client_socket.settimeout(0.5)
-                chunk = client_socket.recv(4096)
-            except socket.timeout:
-                # No hay más datos para recibir
-                break
-        
-        # Cerrar conexión
-        client_socket.close()
-        
-        # Decodificar respuesta JSON
-        if response:
-            data = json.loads(response.decode('utf-8'))
-            return data, None
-        else:
-            return None, "Respuesta vacía de main.py"
+                response = self._request()
+            except (BrokenPipeError, ConnectionResetError, ConnectionAbortedError):
+                # main.py cerró la conexión persistente (reinicio, inactividad): reconectar una vez
+                self.close()
+                response = self._request()
             
-    except socket.timeout:
-        return None, "Timeout al conectar con main.py"
-    except socket.error as e:
-        return None, f"Error de conexión: {e}"
-    except json.JSONDecodeError as e:
-        return None, f"Error al decodificar JSON: {e}"
-    except Exception as e:
-        return None, f"Error inesperado: {e}"
+            # Decodificar respuesta JSON (orjson acepta bytes directamente)
+            if response:
+                return orjson.loads(response), None
+            else:
+                return None, "Respuesta vacía de main.py"
+        
+        except socket.timeout:
+            self.close()
+            return None, "Timeout al conectar con main.py"
+        except socket.error as e:
+            self.close()
+            return None, f"Error de conexión: {e}"
+        except json.JSONDecodeError as e:
+            # orjson.JSONDecodeError hereda de json.JSONDecodeError
+            self.close()
+            return None, f"Error al decodificar JSON: {e}"
+        except Exception as e:
+            self.close()
+            return None, f"Error inesperado: {e}"
+
+main_py_client = MainPyClient(config.MAIN_PY_HOST, config.MAIN_PY_PORT)
+
+# Función para obtener datos del script main.py
+def get_data_from_main():
+    """
+    Intenta obtener datos del script main.py
+    El script main.py debería exponer un servidor de sockets simple que devuelva
+    JSON con los datos actuales del sistema.
+    """
+    return main_py_client.get_data()
 
 # Función para el hilo de actualización de datos
 def update_data_thread():
@@ -131,8 +212,7 @@ def update_data_thread():
                 
                 # Procesar datos de niveles de llenado
                 if 'fill_levels' in data:
-                    for compartment, level in data['fill_levels'].items():
-                        db.insert_fill_level(compartment, level)
+                    db.insert_fill_levels_bulk(data['fill_levels'].items())
                 
                 # Procesar datos de la última detección
                 if 'detection' in data and data['detection']:
@@ -141,6 +221,12 @@ def update_data_thread():
                     if waste_type and confidence:
                         db.insert_detection(waste_type, confidence)
                 
+                # Escribir el lote del ciclo antes de que los clientes vuelvan a consultar
+                db.flush()
+                
+                # Los datos cacheados de la API ya no son válidos
+                invalidate_cache()
+                
                 # Emitir evento de actualización a clientes conectados
                 socketio.emit('data_update', {
                     'success': True,
@@ -182,13 +268,10 @@ def handle_connect():
 def handle_update_request():
     """Forzar una actualización inmediata de datos cuando el cliente lo solicita"""
     try:
-        # Obtener datos actualizados de la base de datos
-        db = database.get_db()
-        
-        # Construir respuesta con datos actuales
-        fill_levels = db.get_latest_fill_levels()
-        statistics = db.get_statistics()
-        system_status = db.get_system_status()
+        # Obtener datos actualizados (a través de la caché de consultas de la API)
+        fill_levels = cached_query('get_latest_fill_levels')
+        statistics = cached_query('get_statistics')
+        system_status = cached_query('get_system_status')
         
         # Emitir datos actualizados solo al cliente que lo solicitó
         emit('data_update', {
@@ -223,13 +306,16 @@ if __name__ == '__main__':
         
         # Iniciar servidor web
         logger.info(f"Iniciando servidor Flask en el puerto {config.PORT}")
-        socketio.run(app, host='0.0.0.0', port=config.PORT)
+        socketio.run(app, host='0.0.0.0', port=config.PORT, log_output=config.DEBUG)
         
     except KeyboardInterrupt:
         logger.info("Servidor detenido por el usuario")
     except Exception as e:
         logger.error(f"Error al iniciar el servidor: {e}")
     finally:
+        # Cerrar conexión con main.py
+        main_py_client.close()
+        
         # Cerrar conexión a la base de datos
         if 'db' in locals() and db:
             db.close() 
\ No newline at end of file
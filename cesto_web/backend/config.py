@@ -10,11 +10,29 @@ DB_USER = os.getenv('DB_USER', 'cesto_user')
 DB_PASSWORD = os.getenv('DB_PASSWORD', 'cesto_password')
 DB_NAME = os.getenv('DB_NAME', 'cesto_inteligente_db')
 DB_PORT = int(os.getenv('DB_PORT', '3306'))
+# Conexiones abiertas en el pool (máximo 32 en mysql-connector)
+DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', '16'))
+# Tiempo máximo para establecer una conexión con MySQL (segundos)
+DB_CONNECT_TIMEOUT = int(os.getenv('DB_CONNECT_TIMEOUT', '2'))
+# Conector en Python puro (True) o extensión C (False); sin definir se elige
+# automáticamente: puro bajo eventlet (E/S cooperativa), extensión C en otro caso
+DB_USE_PURE = os.getenv('DB_USE_PURE') == 'True' if os.getenv('DB_USE_PURE') else None
+# Escritura por lotes en un hilo aparte: filas encoladas como máximo, filas por
+# lote y tiempo máximo de espera para completar un lote (segundos)
+DB_WRITE_QUEUE_SIZE = int(os.getenv('DB_WRITE_QUEUE_SIZE', '10000'))
+DB_BATCH_SIZE = int(os.getenv('DB_BATCH_SIZE', '200'))
+DB_BATCH_DELAY = float(os.getenv('DB_BATCH_DELAY', '0.1'))
+# Intervalo de volcado de los contadores de estadísticas en memoria (segundos)
+DB_STATS_FLUSH_INTERVAL = float(os.getenv('DB_STATS_FLUSH_INTERVAL', '5.0'))
 
 # Configuración de la aplicación Flask
 DEBUG = os.getenv('DEBUG', 'True') == 'True'
 SECRET_KEY = os.getenv('SECRET_KEY', 'clave_secreta_desarrollo')
 PORT = int(os.getenv('PORT', '5000'))
+# Tiempo de caché en el navegador para archivos estáticos (segundos)
+STATIC_MAX_AGE = int(os.getenv('STATIC_MAX_AGE', '3600'))
+# Tamaño mínimo (bytes) a partir del cual se comprimen las respuestas HTTP y de Socket.IO
+COMPRESSION_THRESHOLD = int(os.getenv('COMPRESSION_THRESHOLD', '1024'))
 
 # Configuración de comunicación con main.py
 MAIN_PY_HOST = os.getenv('MAIN_PY_HOST', '127.0.0.1')
@@ -22,4 +40,6 @@ MAIN_PY_PORT = int(os.getenv('MAIN_PY_PORT', '5001'))
 
 # Configuración de intervalos
 # Intervalo de actualización de datos desde main.py (segundos)
-UPDATE_INTERVAL = int(os.getenv('UPDATE_INTERVAL', '5')) 
\ No newline at end of file
+UPDATE_INTERVAL = int(os.getenv('UPDATE_INTERVAL', '5'))
+# Vigencia de la caché de consultas de la API (segundos)
+API_CACHE_TTL = float(os.getenv('API_CACHE_TTL', '1.0')) 
\ No newline at end of file
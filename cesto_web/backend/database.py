@@ -1,7 +1,14 @@
 import mysql.connector
+from mysql.connector import pooling
 import logging
-from datetime import datetime
+import queue
+import socket
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
 import config
+import migrate
 
 # Configurar logging
 logging.basicConfig(
@@ -11,139 +18,365 @@ logging.basicConfig(
 )
 logger = logging.getLogger('database')
 
+# Suma detecciones al contador de un tipo de residuo en una sola sentencia
+# (requiere la clave única sobre statistics.waste_type)
+STATISTICS_UPSERT = """
+INSERT INTO statistics (waste_type, count, last_updated)
+VALUES (%s, %s, NOW(6))
+ON DUPLICATE KEY UPDATE count = count + VALUES(count), last_updated = VALUES(last_updated)
+"""
+
+# Sentencias de texto fijo que se ejecutan en cada ciclo: se preparan una vez
+# por conexión física y se reutilizan (ver Database._reused_cursor)
+SYSTEM_STATUS_CURRENT_REPLACE = "REPLACE INTO system_status_current (id, status, message, timestamp) VALUES (1, %s, %s, NOW(6))"
+SYSTEM_STATUS_CURRENT_SELECT = "SELECT status, message, timestamp FROM system_status_current WHERE id = 1"
+
+# Último nivel de cada compartimento (una fila por compartimento en fill_levels_current)
+FILL_LEVELS_CURRENT_UPSERT = """
+INSERT INTO fill_levels_current (compartment, level, timestamp)
+VALUES (%s, %s, NOW(6))
+ON DUPLICATE KEY UPDATE level = VALUES(level), timestamp = VALUES(timestamp)
+"""
+
+# INSERT de histórico: terminan en VALUES (...) para que executemany los reescriba
+# en un único INSERT de varias filas
+FILL_LEVELS_INSERT = "INSERT INTO fill_levels (compartment, level, timestamp) VALUES (%s, %s, NOW(6))"
+DETECTIONS_INSERT = "INSERT INTO detections (waste_type, confidence, timestamp) VALUES (%s, %s, NOW(6))"
+SYSTEM_STATUS_INSERT = "INSERT INTO system_status (status, message, timestamp) VALUES (%s, %s, NOW(6))"
+
+def _use_pure_connector():
+    """
+    Decide si usar el conector en Python puro o la extensión C.
+    Con DB_USE_PURE sin definir se usa la extensión C (decodifica las filas más
+    rápido), salvo si eventlet ha parcheado los sockets: la extensión C hace E/S
+    bloqueante fuera del hub y detendría el servidor durante cada consulta,
+    mientras que el conector puro cede el control al resto de peticiones.
+    """
+    if config.DB_USE_PURE is not None:
+        return config.DB_USE_PURE
+    try:
+        from eventlet import patcher
+    except ImportError:
+        return False
+    return patcher.is_monkey_patched('socket')
+
+def _set_tcp_nodelay(conn):
+    """
+    Desactiva el algoritmo de Nagle en el socket de una conexión del conector en
+    Python puro, para que los paquetes pequeños (INSERT de una fila, lecturas por
+    clave) salgan sin esperar. La extensión C (libmysqlclient) ya lo hace.
+    """
+    raw_connection = getattr(conn, '_cnx', conn)
+    sock = getattr(getattr(raw_connection, '_socket', None), 'sock', None)
+    if sock is not None and sock.family in (socket.AF_INET, socket.AF_INET6):
+        try:
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        except OSError as e:
+            logger.warning(f"No se pudo activar TCP_NODELAY en la conexión: {e}")
+
 # Clase para manejar la conexión y operaciones de la base de datos
 class Database:
     def __init__(self):
-        """Inicializa la conexión a la base de datos."""
-        self.connection = None
+        """Inicializa el pool de conexiones a la base de datos."""
+        self.pool = None
+        
+        # Filas pendientes de escribir: las inserta por lotes el hilo escritor
+        self._write_queue = queue.Queue(maxsize=config.DB_WRITE_QUEUE_SIZE)
+        self._writer_thread = threading.Thread(target=self._writer_loop, name="db-writer", daemon=True)
+        
+        # Contadores de estadísticas aún no escritos: el hilo escritor los vuelca
+        # cada DB_STATS_FLUSH_INTERVAL segundos (en curso = volcado sin confirmar)
+        self._stats_lock = threading.Lock()
+        self._pending_stats = Counter()
+        self._inflight_stats = Counter()
+        
+        # Cursores reutilizados por conexión física: {connection_id: {clave: cursor}}
+        # (clave = sentencia para los preparados, 'tuple' para el normal)
+        self._cursors_lock = threading.Lock()
+        self._cursors = {}
+        
         try:
-            self.connection = mysql.connector.connect(
-                host=config.DB_HOST,
-                user=config.DB_USER,
-                password=config.DB_PASSWORD,
-                port=config.DB_PORT,
-                database=config.DB_NAME
-            )
-            logger.info("Conexión a la base de datos establecida")
+            self.pool = self._create_pool()
+            up_to_date = self._schema_is_current()
         except mysql.connector.Error as e:
-            logger.error(f"Error conectando a MySQL: {e}")
-            # Si la base de datos no existe, la creamos
-            if e.errno == mysql.connector.errorcode.ER_BAD_DB_ERROR:
-                self._create_database()
-            else:
+            # Si la base de datos no existe, la crea la migración
+            if e.errno != mysql.connector.errorcode.ER_BAD_DB_ERROR:
+                logger.error(f"Error conectando a MySQL: {e}")
                 raise
+            up_to_date = False
+        
+        if not up_to_date:
+            # Normalmente la migración se ejecuta al desplegar (python migrate.py);
+            # si no se hizo, se ejecuta aquí una sola vez
+            logger.warning("Esquema de la base de datos desactualizado: ejecutando la migración")
+            migrate.migrate()
+            if self.pool is None:
+                self.pool = self._create_pool()
+        
+        logger.info(f"Pool de conexiones a la base de datos establecido ({config.DB_POOL_SIZE} conexiones)")
+        
+        if self.pool:
+            self._writer_thread.start()
+
+    def _create_pool(self):
+        """Crea el pool de conexiones a la base de datos."""
+        return pooling.MySQLConnectionPool(
+            pool_name="cesto",
+            pool_size=config.DB_POOL_SIZE,
+            # Sin COM_RESET_CONNECTION al devolver cada conexión: el reset liberaría
+            # en el servidor las sentencias preparadas que se reutilizan entre préstamos
+            pool_reset_session=False,
+            use_pure=_use_pure_connector(),
+            # Las lecturas no dejan transacciones abiertas (ni instantáneas antiguas) en
+            # las conexiones del pool; las escrituras usan start_transaction()
+            autocommit=True,
+            charset='utf8mb4',
+            collation='utf8mb4_bin',
+            use_unicode=True,
+            compress=False,  # las consultas son pequeñas: comprimir solo añade latencia
+            connection_timeout=config.DB_CONNECT_TIMEOUT,
+            raise_on_warnings=False,
+            host=config.DB_HOST,
+            user=config.DB_USER,
+            password=config.DB_PASSWORD,
+            port=config.DB_PORT,
+            database=config.DB_NAME
+        )
 
-    def _create_database(self):
-        """Crea la base de datos si no existe."""
+    @contextmanager
+    def _connection(self):
+        """Obtiene una conexión del pool y la devuelve al terminar."""
+        conn = self.pool.get_connection()
+        with self._cursors_lock:
+            first_use = conn.connection_id not in self._cursors
+            if first_use:
+                self._cursors[conn.connection_id] = {}
+        if first_use:
+            _set_tcp_nodelay(conn)
         try:
-            conn = mysql.connector.connect(
-                host=config.DB_HOST,
-                user=config.DB_USER,
-                password=config.DB_PASSWORD,
-                port=config.DB_PORT
-            )
-            cursor = conn.cursor()
-            cursor.execute(f"CREATE DATABASE {config.DB_NAME}")
-            cursor.close()
-            conn.close()
-            logger.info(f"Base de datos {config.DB_NAME} creada exitosamente")
-            
-            # Conectar a la base de datos recién creada
-            self.connection = mysql.connector.connect(
-                host=config.DB_HOST,
-                user=config.DB_USER,
-                password=config.DB_PASSWORD,
-                port=config.DB_PORT,
-                database=config.DB_NAME
-            )
-            
-            # Crear tablas
-            self._create_tables()
-            
+            yield conn
+        except mysql.connector.Error:
+            # La conexión puede haberse perdido: sus cursores ya no sirven
+            self._drop_cursors(conn)
+            raise
+        finally:
+            conn.close()  # En una conexión del pool, close() la devuelve al pool
+
+    @contextmanager
+    def _transaction(self):
+        """
+        Obtiene una conexión del pool y ejecuta el bloque en una única transacción:
+        un solo commit al final, o rollback si algo falla (para no devolver al pool
+        una conexión con una transacción a medias).
+        """
+        with self._connection() as conn:
+            conn.start_transaction()
+            try:
+                yield conn
+            except Exception:
+                conn.rollback()
+                raise
+            conn.commit()
+
+    def _reused_cursor(self, conn, key, **cursor_args):
+        """
+        Devuelve el cursor `key` de la conexión física de `conn`, creándolo la primera
+        vez. Los cursores no se cierran: pertenecen a la conexión y se reutilizan en
+        los siguientes préstamos (cada uso debe consumir todos sus resultados).
+        """
+        with self._cursors_lock:
+            cursors = self._cursors.setdefault(conn.connection_id, {})
+            cursor = cursors.get(key)
+            if cursor is None:
+                cursor = conn.cursor(**cursor_args)
+                cursors[key] = cursor
+        return cursor
+
+    def _cursor(self, conn):
+        """Cursor normal (filas como tuplas) reutilizado de la conexión."""
+        return self._reused_cursor(conn, 'tuple')
+
+    def _prepared_cursor(self, conn, query):
+        """
+        Devuelve un cursor preparado para `query` sobre la conexión física de `conn`.
+        El servidor analiza la sentencia una sola vez y las siguientes ejecuciones
+        (en este u otro préstamo de la misma conexión) solo envían los parámetros.
+        """
+        return self._reused_cursor(conn, query, prepared=True)
+
+    def _drop_cursors(self, conn):
+        """Olvida los cursores reutilizados de una conexión."""
+        with self._cursors_lock:
+            self._cursors.pop(conn.connection_id, None)
+
+    def _schema_is_current(self):
+        """Comprueba que la versión registrada en schema_version sea la de migrate.py."""
+        try:
+            with self._connection() as conn:
+                cursor = self._cursor(conn)
+                cursor.execute("SELECT version FROM schema_version WHERE id = 1")
+                row = cursor.fetchall()
         except mysql.connector.Error as e:
-            logger.error(f"Error al crear la base de datos: {e}")
+            if e.errno == mysql.connector.errorcode.ER_NO_SUCH_TABLE:
+                return False
             raise
+        return bool(row) and row[0][0] >= migrate.SCHEMA_VERSION
 
-    def _create_tables(self):
-        """Crea las tablas necesarias si no existen."""
-        cursor = self.connection.cursor()
-        
-        # Tabla para los niveles de llenado de cada compartimento
-        cursor.execute('''
-        CREATE TABLE IF NOT EXISTS fill_levels (
-            id INT AUTO_INCREMENT PRIMARY KEY,
-            compartment VARCHAR(50) NOT NULL,
-            level FLOAT NOT NULL,
-            timestamp DATETIME NOT NULL
-        )
-        ''')
-        
-        # Tabla para las detecciones de residuos
-        cursor.execute('''
-        CREATE TABLE IF NOT EXISTS detections (
-            id INT AUTO_INCREMENT PRIMARY KEY,
-            waste_type VARCHAR(50) NOT NULL,
-            confidence FLOAT NOT NULL,
-            timestamp DATETIME NOT NULL
-        )
-        ''')
-        
-        # Tabla para estadísticas
-        cursor.execute('''
-        CREATE TABLE IF NOT EXISTS statistics (
-            id INT AUTO_INCREMENT PRIMARY KEY,
-            waste_type VARCHAR(50) NOT NULL,
-            count INT NOT NULL,
-            last_updated DATETIME NOT NULL
-        )
-        ''')
-        
-        # Tabla para estado del sistema
-        cursor.execute('''
-        CREATE TABLE IF NOT EXISTS system_status (
-            id INT AUTO_INCREMENT PRIMARY KEY,
-            status VARCHAR(50) NOT NULL,
-            message TEXT,
-            timestamp DATETIME NOT NULL
-        )
-        ''')
+    def close(self):
+        """Escribe las filas pendientes y cierra las conexiones del pool."""
+        if self._writer_thread.is_alive():
+            # El marcador None detiene el hilo escritor tras vaciar la cola
+            self._write_queue.put(None)
+            self._writer_thread.join()
+        if self.pool:
+            # El pool no expone un cierre público: cerrar las conexiones inactivas
+            self.pool._remove_connections()
+            self.pool = None
+            logger.info("Conexiones a la base de datos cerradas")
+
+    # Escritura por lotes (hilo escritor)
+    def _enqueue(self, item):
+        """
+        Encola una fila para el hilo escritor sin bloquear al llamador.
+        Devuelve False si la fila se ha descartado.
+        """
+        if not self._writer_thread.is_alive():
+            logger.error("No hay conexión a la base de datos")
+            return False
+        try:
+            self._write_queue.put_nowait(item)
+            return True
+        except queue.Full:
+            logger.warning(f"Cola de escritura llena: se descarta {item[0]}")
+            return False
+
+    def _writer_loop(self):
+        """
+        Hilo escritor: espera la primera fila pendiente y reúne las que lleguen en
+        los siguientes DB_BATCH_DELAY segundos (hasta DB_BATCH_SIZE) en un solo lote.
+        Cada DB_STATS_FLUSH_INTERVAL segundos (y al detenerse) vuelca las estadísticas.
+        """
+        stop = False
+        next_stats_flush = time.monotonic() + config.DB_STATS_FLUSH_INTERVAL
+        while not stop:
+            try:
+                timeout = max(next_stats_flush - time.monotonic(), 0)
+                batch = [self._write_queue.get(timeout=timeout)]
+            except queue.Empty:
+                batch = []
+            
+            if batch:
+                deadline = time.monotonic() + config.DB_BATCH_DELAY
+                while batch[-1] is not None and len(batch) < config.DB_BATCH_SIZE:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    try:
+                        batch.append(self._write_queue.get(timeout=remaining))
+                    except queue.Empty:
+                        break
+                
+                if batch[-1] is None:
+                    stop = True
+                
+                rows = [item for item in batch if item is not None]
+                try:
+                    self._write_batch(
+                        [item[1:] for item in rows if item[0] == 'fill_level'],
+                        [item[1:] for item in rows if item[0] == 'detection'],
+                        [item[1:] for item in rows if item[0] == 'system_status']
+                    )
+                except Exception as e:
+                    logger.error(f"Error en el hilo escritor: {e}")
+                finally:
+                    for _ in batch:
+                        self._write_queue.task_done()
+            
+            if stop or time.monotonic() >= next_stats_flush:
+                self._flush_statistics()
+                next_stats_flush = time.monotonic() + config.DB_STATS_FLUSH_INTERVAL
+
+    def _flush_statistics(self):
+        """Suma a la tabla statistics los contadores acumulados en memoria (un solo upsert)."""
+        with self._stats_lock:
+            if not self._pending_stats:
+                return
+            counts = self._inflight_stats = self._pending_stats
+            self._pending_stats = Counter()
         
-        self.connection.commit()
-        cursor.close()
-        logger.info("Tablas creadas exitosamente")
+        try:
+            with self._transaction() as conn:
+                cursor = self._cursor(conn)
+                cursor.executemany(STATISTICS_UPSERT, list(counts.items()))
+            with self._stats_lock:
+                self._inflight_stats = Counter()
+            logger.debug("Estadísticas volcadas: %s", counts)
+        except Exception as e:
+            logger.error(f"Error actualizando estadísticas: {e}")
+            # Conservar los contadores para el siguiente volcado
+            with self._stats_lock:
+                self._pending_stats.update(counts)
+                self._inflight_stats = Counter()
 
-    def close(self):
-        """Cierra la conexión a la base de datos."""
-        if self.connection:
-            self.connection.close()
-            logger.info("Conexión a la base de datos cerrada")
+    def flush(self):
+        """Espera a que el hilo escritor haya guardado todas las filas encoladas."""
+        if self._writer_thread.is_alive():
+            self._write_queue.join()
+
+    def _write_batch(self, fill_rows, detection_rows, status_rows):
+        """Escribe un lote de filas en la base de datos con una sola transacción."""
+        if not fill_rows and not detection_rows and not status_rows:
+            return
+        
+        try:
+            with self._transaction() as conn:
+                cursor = self._cursor(conn)
+                
+                if fill_rows:
+                    # Histórico
+                    cursor.executemany(FILL_LEVELS_INSERT, fill_rows)
+                    
+                    # Último nivel de cada compartimento del lote
+                    latest = {compartment: (compartment, level) for compartment, level in fill_rows}
+                    cursor.executemany(FILL_LEVELS_CURRENT_UPSERT, list(latest.values()))
+                
+                if detection_rows:
+                    cursor.executemany(DETECTIONS_INSERT, detection_rows)
+                
+                if status_rows:
+                    cursor.executemany(SYSTEM_STATUS_INSERT, status_rows)
+            
+            logger.debug(
+                "Lote insertado: %d niveles de llenado, %d detecciones, %d estados",
+                len(fill_rows), len(detection_rows), len(status_rows)
+            )
+        except mysql.connector.Error as e:
+            logger.error(f"Error insertando lote en la base de datos: {e}")
 
     # Métodos para operaciones con niveles de llenado
     def insert_fill_level(self, compartment, level):
         """
-        Inserta un nuevo registro de nivel de llenado.
+        Encola un nuevo registro de nivel de llenado para el hilo escritor.
         
         Args:
             compartment (str): Nombre del compartimento (Metal, Glass, Plastic, Carton)
             level (float): Nivel de llenado (0-100%)
         """
-        if not self.connection:
-            logger.error("No hay conexión a la base de datos")
-            return
-            
-        try:
-            cursor = self.connection.cursor()
-            query = """
-            INSERT INTO fill_levels (compartment, level, timestamp) 
-            VALUES (%s, %s, %s)
-            """
-            now = datetime.now()
-            cursor.execute(query, (compartment, level, now))
-            self.connection.commit()
-            cursor.close()
-            logger.debug(f"Nivel de llenado para {compartment}: {level}% insertado")
-        except mysql.connector.Error as e:
-            logger.error(f"Error insertando nivel de llenado: {e}")
+        self._enqueue(('fill_level', compartment, level))
+        logger.debug("Nivel de llenado para %s: %s%% encolado", compartment, level)
+
+    def insert_fill_levels_bulk(self, rows):
+        """
+        Encola varios niveles de llenado a la vez.
+        Pensado para lotes de hasta ~500 filas; el hilo escritor los inserta con
+        executemany, que el conector convierte en un solo INSERT de varias filas.
+        
+        Args:
+            rows (iterable): Pares (compartment, level)
+        """
+        for compartment, level in rows:
+            if not self._enqueue(('fill_level', compartment, level)):
+                break
 
     def get_latest_fill_levels(self):
         """
@@ -152,31 +385,22 @@ class Database:
         Returns:
             dict: Diccionario con los niveles de llenado por compartimento
         """
-        if not self.connection:
+        if not self.pool:
             logger.error("No hay conexión a la base de datos")
             return {}
             
         try:
-            cursor = self.connection.cursor(dictionary=True)
-            query = """
-            SELECT t1.compartment, t1.level, t1.timestamp
-            FROM fill_levels t1
-            INNER JOIN (
-                SELECT compartment, MAX(timestamp) as max_timestamp
-                FROM fill_levels
-                GROUP BY compartment
-            ) t2
-            ON t1.compartment = t2.compartment AND t1.timestamp = t2.max_timestamp
-            """
-            cursor.execute(query)
-            results = cursor.fetchall()
-            cursor.close()
+            with self._connection() as conn:
+                cursor = self._cursor(conn)
+                query = "SELECT compartment, level FROM fill_levels_current"
+                cursor.execute(query)
+                results = cursor.fetchall()
             
             # Convertir a diccionario {compartment: level}
             levels = {}
-            for row in results:
-                levels[row['compartment']] = row['level']
-                
+            for compartment, level in results:
+                levels[compartment] = level
+            
             return levels
             
         except mysql.connector.Error as e:
@@ -186,97 +410,72 @@ class Database:
     # Métodos para operaciones con detecciones
     def insert_detection(self, waste_type, confidence):
         """
-        Inserta un nuevo registro de detección de residuo.
+        Encola un nuevo registro de detección de residuo para el hilo escritor.
+        El contador de estadísticas se incrementa en memoria (ver _flush_statistics).
         
         Args:
             waste_type (str): Tipo de residuo detectado (Metal, Glass, Plastic, Carton)
             confidence (float): Confianza de la detección (0-1)
         """
-        if not self.connection:
-            logger.error("No hay conexión a la base de datos")
-            return
-            
-        try:
-            cursor = self.connection.cursor()
-            query = """
-            INSERT INTO detections (waste_type, confidence, timestamp) 
-            VALUES (%s, %s, %s)
-            """
-            now = datetime.now()
-            cursor.execute(query, (waste_type, confidence, now))
-            self.connection.commit()
-            
-            # Actualizar estadísticas
-            self._update_statistics(waste_type)
-            
-            cursor.close()
-            logger.debug(f"Detección de {waste_type} (conf: {confidence}) insertada")
-        except mysql.connector.Error as e:
-            logger.error(f"Error insertando detección: {e}")
+        if self._enqueue(('detection', waste_type, confidence)):
+            with self._stats_lock:
+                self._pending_stats[waste_type] += 1
+        logger.debug("Detección de %s (conf: %s) encolada", waste_type, confidence)
 
-    def _update_statistics(self, waste_type):
+    def insert_detections_bulk(self, rows):
         """
-        Actualiza las estadísticas de conteo para un tipo de residuo.
+        Encola varias detecciones a la vez (ver insert_fill_levels_bulk).
         
         Args:
-            waste_type (str): Tipo de residuo detectado
+            rows (iterable): Pares (waste_type, confidence)
         """
-        try:
-            cursor = self.connection.cursor()
-            
-            # Verificar si ya existe una entrada para este tipo
-            query = "SELECT count FROM statistics WHERE waste_type = %s"
-            cursor.execute(query, (waste_type,))
-            result = cursor.fetchone()
-            
-            now = datetime.now()
-            
-            if result:
-                # Actualizar contador existente
-                current_count = result[0]
-                query = """
-                UPDATE statistics 
-                SET count = %s, last_updated = %s 
-                WHERE waste_type = %s
-                """
-                cursor.execute(query, (current_count + 1, now, waste_type))
-            else:
-                # Insertar nuevo contador
-                query = """
-                INSERT INTO statistics (waste_type, count, last_updated) 
-                VALUES (%s, %s, %s)
-                """
-                cursor.execute(query, (waste_type, 1, now))
-                
-            self.connection.commit()
-            cursor.close()
-            
-        except mysql.connector.Error as e:
-            logger.error(f"Error actualizando estadísticas: {e}")
+        counts = Counter()
+        for waste_type, confidence in rows:
+            if not self._enqueue(('detection', waste_type, confidence)):
+                break
+            counts[waste_type] += 1
+        
+        with self._stats_lock:
+            self._pending_stats.update(counts)
 
     def get_statistics(self):
         """
-        Obtiene las estadísticas de conteo para todos los tipos de residuos.
+        Obtiene las estadísticas de conteo para todos los tipos de residuos,
+        incluidas las detecciones cuyo contador aún no se ha volcado a la tabla.
+        
+        Returns:
+            dict: Diccionario con los conteos por tipo de residuo
+        """
+        stats = self._get_stored_statistics()
+        with self._stats_lock:
+            unflushed = self._pending_stats + self._inflight_stats
+        for waste_type, count in unflushed.items():
+            stats[waste_type] = stats.get(waste_type, 0) + count
+        return stats
+
+    def _get_stored_statistics(self):
+        """
+        Obtiene las estadísticas de conteo guardadas en la tabla statistics.
         
         Returns:
             dict: Diccionario con los conteos por tipo de residuo
         """
-        if not self.connection:
+        if not self.pool:
             logger.error("No hay conexión a la base de datos")
             return {}
             
         try:
-            cursor = self.connection.cursor(dictionary=True)
-            query = "SELECT waste_type, count FROM statistics"
-            cursor.execute(query)
-            results = cursor.fetchall()
-            cursor.close()
+            with self._connection() as conn:
+                cursor = self._cursor(conn)
+                query = "SELECT waste_type, count FROM statistics"
+                cursor.execute(query)
+                results = cursor.fetchall()
             
             # Convertir a diccionario {waste_type: count}
             stats = {}
-            for row in results:
-                stats[row['waste_type']] = row['count']
-                
+            for waste_type, count in results:
+                stats[waste_type] = count
+            
             return stats
             
         except mysql.connector.Error as e:
@@ -286,27 +485,23 @@ class Database:
     # Métodos para operaciones con estado del sistema
     def update_system_status(self, status, message=None):
         """
-        Actualiza el estado del sistema.
+        Actualiza el estado actual del sistema (fila única de system_status_current)
+        y encola el cambio en el histórico para el hilo escritor.
         
         Args:
             status (str): Estado del sistema (active, inactive, error, etc)
             message (str, optional): Mensaje descriptivo
         """
-        if not self.connection:
+        if not self.pool:
             logger.error("No hay conexión a la base de datos")
             return
             
         try:
-            cursor = self.connection.cursor()
-            query = """
-            INSERT INTO system_status (status, message, timestamp) 
-            VALUES (%s, %s, %s)
-            """
-            now = datetime.now()
-            cursor.execute(query, (status, message, now))
-            self.connection.commit()
-            cursor.close()
-            logger.debug(f"Estado del sistema actualizado: {status}")
+            with self._connection() as conn:
+                cursor = self._prepared_cursor(conn, SYSTEM_STATUS_CURRENT_REPLACE)
+                cursor.execute(SYSTEM_STATUS_CURRENT_REPLACE, (status, message))
+            self._enqueue(('system_status', status, message))
+            logger.debug("Estado del sistema actualizado: %s", status)
         except mysql.connector.Error as e:
             logger.error(f"Error actualizando estado del sistema: {e}")
 
@@ -317,24 +512,19 @@ class Database:
         Returns:
             dict: Diccionario con el estado actual
         """
-        if not self.connection:
+        if not self.pool:
             logger.error("No hay conexión a la base de datos")
             return {}
             
         try:
-            cursor = self.connection.cursor(dictionary=True)
-            query = """
-            SELECT status, message, timestamp
-            FROM system_status
-            ORDER BY timestamp DESC
-            LIMIT 1
-            """
-            cursor.execute(query)
-            result = cursor.fetchone()
-            cursor.close()
+            with self._connection() as conn:
+                cursor = self._prepared_cursor(conn, SYSTEM_STATUS_CURRENT_SELECT)
+                cursor.execute(SYSTEM_STATUS_CURRENT_SELECT)
+                result = cursor.fetchall()
             
             if result:
-                return result
+                status, message, timestamp = result[0]
+                return {"status": status, "message": message, "timestamp": timestamp}
             else:
                 return {"status": "unknown", "message": "No hay datos de estado", "timestamp": None}
                 
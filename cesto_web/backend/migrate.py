@@ -0,0 +1,199 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+migrate.py - Crea y actualiza el esquema de la base de datos del Cesto Inteligente
+Se ejecuta una vez por despliegue, antes de iniciar el servidor:
+
+    python migrate.py
+
+Es idempotente: sobre un esquema ya actualizado no modifica nada.
+"""
+
+import logging
+import mysql.connector
+import config
+
+logger = logging.getLogger('migrate')
+
+# Versión del esquema que crea esta migración. database.py la comprueba al
+# arrancar; incrementarla al cambiar las tablas o los índices
+SCHEMA_VERSION = 1
+
+# Tablas del esquema en orden de creación: (nombre, DDL)
+TABLES = (
+    # Niveles de llenado de cada compartimento (histórico)
+    ("fill_levels", """
+    CREATE TABLE IF NOT EXISTS fill_levels (
+        id INT AUTO_INCREMENT PRIMARY KEY,
+        compartment VARCHAR(50) NOT NULL,
+        level FLOAT NOT NULL,
+        timestamp DATETIME NOT NULL,
+        INDEX idx_fl_comp_ts (compartment, timestamp DESC)
+    )
+    """),
+    # Último nivel de cada compartimento (una fila por compartimento)
+    ("fill_levels_current", """
+    CREATE TABLE IF NOT EXISTS fill_levels_current (
+        compartment VARCHAR(50) NOT NULL PRIMARY KEY,
+        level FLOAT NOT NULL,
+        timestamp DATETIME NOT NULL
+    )
+    """),
+    # Detecciones de residuos
+    ("detections", """
+    CREATE TABLE IF NOT EXISTS detections (
+        id INT AUTO_INCREMENT PRIMARY KEY,
+        waste_type VARCHAR(50) NOT NULL,
+        confidence FLOAT NOT NULL,
+        timestamp DATETIME NOT NULL,
+        INDEX idx_det_ts (timestamp),
+        INDEX idx_det_wt (waste_type)
+    )
+    """),
+    # Estadísticas (una fila por tipo de residuo)
+    ("statistics", """
+    CREATE TABLE IF NOT EXISTS statistics (
+        id INT AUTO_INCREMENT PRIMARY KEY,
+        waste_type VARCHAR(50) NOT NULL,
+        count INT NOT NULL,
+        last_updated DATETIME NOT NULL,
+        UNIQUE KEY uq_statistics_waste_type (waste_type)
+    )
+    """),
+    # Estado del sistema (histórico)
+    ("system_status", """
+    CREATE TABLE IF NOT EXISTS system_status (
+        id INT AUTO_INCREMENT PRIMARY KEY,
+        status VARCHAR(50) NOT NULL,
+        message TEXT,
+        timestamp DATETIME NOT NULL,
+        INDEX idx_ss_ts (timestamp)
+    )
+    """),
+    # Estado actual del sistema: una única fila (id = 1)
+    ("system_status_current", """
+    CREATE TABLE IF NOT EXISTS system_status_current (
+        id TINYINT NOT NULL PRIMARY KEY,
+        status VARCHAR(50) NOT NULL,
+        message TEXT,
+        timestamp DATETIME NOT NULL
+    )
+    """),
+    # Versión del esquema (una única fila, id = 1)
+    ("schema_version", """
+    CREATE TABLE IF NOT EXISTS schema_version (
+        id TINYINT NOT NULL PRIMARY KEY,
+        version INT NOT NULL
+    )
+    """),
+)
+
+# Índices añadidos después de la primera versión del esquema: (tabla, nombre, definición).
+# Ya están en el DDL de TABLES; aquí se añaden a las bases de datos más antiguas
+SCHEMA_INDEXES = (
+    ("fill_levels", "idx_fl_comp_ts", "INDEX idx_fl_comp_ts (compartment, timestamp DESC)"),
+    ("detections", "idx_det_ts", "INDEX idx_det_ts (timestamp)"),
+    ("detections", "idx_det_wt", "INDEX idx_det_wt (waste_type)"),
+    ("statistics", "uq_statistics_waste_type", "UNIQUE KEY uq_statistics_waste_type (waste_type)"),
+    ("system_status", "idx_ss_ts", "INDEX idx_ss_ts (timestamp)"),
+)
+
+# Relleno de las tablas "current" cuando se crean sobre un histórico existente
+BACKFILL = {
+    "fill_levels_current": """
+    INSERT INTO fill_levels_current (compartment, level, timestamp)
+    SELECT f.compartment, f.level, f.timestamp
+    FROM fill_levels f
+    INNER JOIN (
+        SELECT compartment, MAX(timestamp) AS max_timestamp
+        FROM fill_levels
+        GROUP BY compartment
+    ) latest
+    ON f.compartment = latest.compartment AND f.timestamp = latest.max_timestamp
+    ON DUPLICATE KEY UPDATE level = VALUES(level)
+    """,
+    "system_status_current": """
+    INSERT INTO system_status_current (id, status, message, timestamp)
+    SELECT 1, status, message, timestamp
+    FROM system_status
+    ORDER BY timestamp DESC, id DESC
+    LIMIT 1
+    """,
+}
+
+def _add_missing_indexes(cursor, existing_tables):
+    """Añade los índices de SCHEMA_INDEXES que falten en las tablas que ya existían."""
+    cursor.execute(
+        "SELECT DISTINCT table_name, index_name FROM information_schema.statistics "
+        "WHERE table_schema = DATABASE()"
+    )
+    existing = {(table.lower(), index) for table, index in cursor.fetchall()}
+
+    # Sin la clave única, statistics puede tener filas duplicadas (el antiguo
+    # SELECT + UPDATE/INSERT no era atómico): reconstruirla agregando las
+    # detecciones en el servidor antes de añadir la clave
+    if 'statistics' in existing_tables and ('statistics', 'uq_statistics_waste_type') not in existing:
+        cursor.execute("START TRANSACTION")
+        cursor.execute("DELETE FROM statistics")
+        cursor.execute("""
+        INSERT INTO statistics (waste_type, count, last_updated)
+        SELECT waste_type, COUNT(*), MAX(timestamp)
+        FROM detections
+        GROUP BY waste_type
+        """)
+        cursor.execute("COMMIT")
+        logger.info("Tabla statistics reconstruida a partir de las detecciones")
+
+    for table, index, definition in SCHEMA_INDEXES:
+        if (table, index) in existing:
+            continue
+        try:
+            cursor.execute(f"ALTER TABLE {table} ADD {definition}")
+            logger.info(f"Índice {index} añadido a la tabla {table}")
+        except mysql.connector.Error as e:
+            logger.error(f"No se pudo añadir el índice {index} a {table}: {e}")
+
+def migrate():
+    """
+    Crea la base de datos y las tablas que falten, actualiza las creadas con
+    versiones anteriores y registra SCHEMA_VERSION en schema_version.
+    """
+    conn = mysql.connector.connect(
+        host=config.DB_HOST,
+        user=config.DB_USER,
+        password=config.DB_PASSWORD,
+        port=config.DB_PORT,
+        autocommit=True
+    )
+    try:
+        cursor = conn.cursor()
+        cursor.execute(f"CREATE DATABASE IF NOT EXISTS {config.DB_NAME}")
+        cursor.execute(f"USE {config.DB_NAME}")
+
+        cursor.execute("SHOW TABLES")
+        existing_tables = {row[0] for row in cursor.fetchall()}
+
+        for table, ddl in TABLES:
+            if table in existing_tables:
+                continue
+            cursor.execute(ddl)
+            if table in BACKFILL:
+                cursor.execute(BACKFILL[table])
+            logger.info(f"Tabla {table} creada")
+
+        _add_missing_indexes(cursor, existing_tables)
+
+        cursor.execute("REPLACE INTO schema_version (id, version) VALUES (1, %s)", (SCHEMA_VERSION,))
+        cursor.close()
+        logger.info(f"Esquema de {config.DB_NAME} en la versión {SCHEMA_VERSION}")
+    finally:
+        conn.close()
+
+
+if __name__ == '__main__':
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s',
+        datefmt='%Y-%m-%d %H:%M:%S'
+    )
+    migrate()
@@ -13,9 +13,9 @@
 import tkinter as tk # Renombrado para claridad
 from tkinter import Label, Scale, Frame, Button, HORIZONTAL # Importar widgets adicionales
 from PIL import Image, ImageTk
-import imutils
 import cv2
 import numpy as np
+import torch
 from ultralytics import YOLO
 import math
 import time
@@ -23,9 +23,30 @@ import threading # Para evitar bloqueo de GUI con el motor
 import logging
 import logging.handlers
 import os
+import sys
 from datetime import datetime
+from types import SimpleNamespace
 import queue
-import json
+from concurrent.futures import ThreadPoolExecutor
+
+# orjson es opcional: lee y escribe config.json más rápido que json
+try:
+    import orjson
+    _json_loads = orjson.loads
+    def _json_dumps(obj):
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+except ImportError:
+    import json
+    _json_loads = json.loads
+    def _json_dumps(obj):
+        return json.dumps(obj, indent=4).encode('utf-8')
+
+# Numba es opcional: acelera el preprocesado del detector ONNX y el dibujo de las cajas
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
 
 # Importar módulos del proyecto
 import motor_controller
@@ -38,11 +59,27 @@ class Config:
     """Clase para manejar la configuración del sistema con valores por defecto y persistencia."""
     def __init__(self, config_file='config.json'):
         self.config_file = config_file
+        # Hay cambios sin guardar en el archivo
+        self._dirty = False
         self.defaults = {
             # Configuración del Modelo y Detección
             'model_path': 'models/best.pt',
             'class_names': ['Metal', 'Glass', 'Plastic', 'Carton'],
             'min_confidence': 0.5,
+            # Formato de inferencia: 'onnx' (CPU), 'openvino' (CPU Intel), 'engine' (TensorRT, GPU/Jetson)
+            # o 'pt' para usar directamente el checkpoint de PyTorch
+            'model_format': 'onnx',
+            # Cuantizar a INT8 el modelo ONNX (calibrado con frames de la cámara al arrancar)
+            'quantize': False,
+            # Frames por llamada al modelo (lotes parciales si la cámara no llega a llenarlo).
+            # Solo se usa en GPU ('engine' o 'pt' con CUDA); en CPU siempre es 1
+            'inference_batch': 1,
+            # Tamaño de entrada del modelo (múltiplo de 32), independiente de la cámara
+            'inference_imgsz': 320,
+            # Fijar los hilos de captura, GUI e inferencia a núcleos propios (solo Linux)
+            'pin_cpus': False,
+            # Reducir y convertir la vista previa con OpenCL (T-API) si hay un dispositivo disponible
+            'use_opencl': False,
             
             # Configuración del Mecanismo y Motor
             'target_steps_map': {
@@ -54,6 +91,9 @@ class Config:
             'home_position_steps': 0,
             'drop_delay': 2.0,
             
+            # Configuración de los Sensores de nivel (segundos entre lecturas de los tres sensores)
+            'sensor_poll_interval': 1.0,
+            
             # Configuración de la Cámara
             'camera_index': 0,
             'frame_width': 640,
@@ -67,46 +107,62 @@ class Config:
         self.load()
     
     def get(self, key, default=None):
-        """Obtener valor de configuración, con fallback a valor por defecto."""
-        parts = key.split('.')
-        
-        # Manejar acceso a diccionarios anidados
-        if len(parts) > 1:
-            current = self.config
-            for part in parts[:-1]:
-                if part not in current:
-                    return self.defaults.get(key, default)
-                current = current[part]
-            return current.get(parts[-1], self.defaults.get(key, default))
-        
-        # Acceso directo a primer nivel
-        return self.config.get(key, self.defaults.get(key, default))
+        """
+        Obtener valor de configuración, con fallback a valor por defecto.
+        Las claves anidadas se piden con puntos ('ui_assets.background').
+        """
+        return self._flat.get(key, self.defaults.get(key, default))
     
     def set(self, key, value):
-        """Establecer valor de configuración."""
+        """Establecer valor de configuración (solo marca cambios si el valor es distinto)."""
+        if key in self.config and self.config[key] == value:
+            return
         self.config[key] = value
+        self._dirty = True
+        self._flatten()
+    
+    def _flatten(self):
+        """
+        Indexa la configuración por su clave con puntos (incluidas las de los
+        diccionarios intermedios) para que get sea una sola búsqueda.
+        """
+        flat = {}
+        pending = [('', self.config)]
+        while pending:
+            prefix, current = pending.pop()
+            for key, value in current.items():
+                flat_key = prefix + key
+                flat[flat_key] = value
+                if isinstance(value, dict):
+                    pending.append((flat_key + '.', value))
+        self._flat = flat
     
     def load(self):
         """Cargar configuración desde archivo JSON."""
         try:
             if os.path.exists(self.config_file):
-                with open(self.config_file, 'r') as f:
-                    self.config = json.load(f)
+                with open(self.config_file, 'rb') as f:
+                    self.config = _json_loads(f.read())
                     logger.info(f"Configuración cargada desde {self.config_file}")
             else:
                 logger.warning(f"Archivo de configuración {self.config_file} no encontrado. Usando valores por defecto.")
                 self.config = self.defaults.copy()
+                self._dirty = True
                 self.save()  # Crear archivo con valores por defecto
         except Exception as e:
             logger.error(f"Error al cargar configuración: {e}")
             self.config = self.defaults.copy()
+        self._flatten()
     
     def save(self):
-        """Guardar configuración a archivo JSON."""
+        """Guardar configuración a archivo JSON (solo si ha cambiado)."""
+        if not self._dirty:
+            return
         try:
-            with open(self.config_file, 'w') as f:
-                json.dump(self.config, f, indent=4)
+            with open(self.config_file, 'wb') as f:
+                f.write(_json_dumps(self.config))
                 logger.info(f"Configuración guardada en {self.config_file}")
+            self._dirty = False
         except Exception as e:
             logger.error(f"Error al guardar configuración: {e}")
 
@@ -154,14 +210,50 @@ except ImportError as e:
     logger.critical(f"No se pudo importar un módulo local: {e}. Asegúrate de que esté en la misma carpeta.")
     exit() # Salir si algún controlador no se encuentra
 
+# --- Hilos de PyTorch ---
+# Dejar núcleos libres para los hilos de captura, dibujo y la GUI en lugar de
+# ocupar todos con la inferencia
+torch.set_num_threads(max(1, (os.cpu_count() or 1) - 2))
+torch.set_num_interop_threads(1)
+
+# --- Hilos de OpenCV ---
+# Activar los kernels SIMD y repartir resize/cvtColor entre los mismos núcleos
+# (el número de hilos solo tiene efecto si OpenCV se compiló con TBB/OpenMP/pthreads)
+cv2.setUseOptimized(True)
+cv2.setNumThreads(max(1, (os.cpu_count() or 1) - 2))
+
 # --- Inicializar configuración ---
 config = Config()
 
+# OpenCL (T-API) solo si se pide y OpenCV encuentra un dispositivo
+USE_OPENCL = bool(config.get('use_opencl')) and cv2.ocl.haveOpenCL()
+cv2.ocl.setUseOpenCL(USE_OPENCL)
+
 # --- Reemplazar constantes con acceso a configuración ---
 MODEL_PATH = config.get('model_path')
-CLASS_NAMES = config.get('class_names')
+CLASS_NAMES = tuple(config.get('class_names'))
 NUM_CLASSES = len(CLASS_NAMES)
 MIN_CONFIDENCE = config.get('min_confidence')
+MODEL_FORMAT = config.get('model_format')
+QUANTIZE_MODEL = config.get('quantize')
+INFERENCE_BATCH = max(1, int(config.get('inference_batch')))
+# En CPU (y con OnnxDetector, que procesa los frames de uno en uno) un lote no
+# acelera la inferencia y solo retrasa el frame más reciente
+if INFERENCE_BATCH > 1 and not (MODEL_FORMAT == 'engine' or (MODEL_FORMAT == 'pt' and torch.cuda.is_available())):
+    logger.info(f"inference_batch={INFERENCE_BATCH} ignorado: los lotes solo se usan en GPU (formato 'engine' o 'pt' con CUDA)")
+    INFERENCE_BATCH = 1
+INFERENCE_IMGSZ = max(32, int(config.get('inference_imgsz')) // 32 * 32)
+CALIBRATION_FRAMES = 200  # Frames de la cámara usados para calibrar la cuantización INT8
+
+# Núcleos de cada hilo cuando pin_cpus está activo (la inferencia con prioridad más alta)
+PIN_CPUS = bool(config.get('pin_cpus'))
+CPU_AFFINITY = {
+    'capture': {0},
+    'gui': {1},
+    'draw': {1},
+    'inference': {2, 3},
+}
+INFERENCE_NICE = -5  # Requiere CAP_SYS_NICE (o root)
 
 # Mapeo de Target Steps desde config
 TARGET_STEPS_MAP = {int(k): v for k, v in config.get('target_steps_map').items()}
@@ -170,9 +262,14 @@ DROP_DELAY = config.get('drop_delay')
 
 CAMERA_INDEX = config.get('camera_index')
 FRAME_WIDTH = config.get('frame_width')
+FRAME_HEIGHT = int(FRAME_WIDTH * 9 / 16)
+CAMERA_FPS = 30
 
 WINDOW_TITLE = config.get('window_title')
 WINDOW_GEOMETRY = config.get('window_geometry')
+GUI_REFRESH_MS = 200          # Refresco de los indicadores de estado (5 Hz)
+SLIDER_LOG_INTERVAL = 1.0     # Segundos mínimos entre logs de un mismo slider mientras se arrastra
+SENSOR_POLL_INTERVAL = config.get('sensor_poll_interval')  # Segundos entre lecturas de los sensores de nivel
 
 # --- Configuración de la GUI ---
 # Rutas a los recursos gráficos (obtenidas del config.json)
@@ -206,6 +303,9 @@ example_texts = {}
 
 # Estado de la aplicación
 last_detected_class_index = -1 # Índice de la última clase detectada y procesada
+last_displayed_class_index = -1 # Índice de la clase cuyas imágenes de ejemplo se muestran
+preview_buffer = None           # Buffer reutilizado para redimensionar la vista previa
+video_photo = None              # PhotoImage reutilizado para el video
 motor_busy = False             # Flag para indicar si el motor está en movimiento (controlado por el hilo)
 motor_thread = None            # Referencia al hilo del motor
 
@@ -224,13 +324,44 @@ sensor_monitoring_active = False  # Indica si el monitoreo de sensores está act
 
 # --- Funciones Auxiliares de GUI ---
 
+def load_photo_image(path):
+    """
+    Carga una imagen directamente en RGB con PIL y la convierte una sola vez a
+    ImageTk.PhotoImage. Devuelve None si no se puede leer. Requiere que la
+    ventana de Tkinter ya exista.
+    """
+    try:
+        with Image.open(path) as img:
+            return ImageTk.PhotoImage(image=img.convert('RGB'))
+    except OSError:
+        return None
+
+def paste_photo(label, photo, img_pil):
+    """
+    Muestra img_pil en label copiándola sobre photo (PhotoImage) si tiene el
+    mismo tamaño; solo crea un PhotoImage nuevo si no existe o cambia el tamaño.
+    Devuelve el PhotoImage en uso.
+    """
+    if photo is None or (photo.width(), photo.height()) != img_pil.size:
+        photo = ImageTk.PhotoImage(image=img_pil)
+        label.configure(image=photo)
+        label.image = photo
+    else:
+        photo.paste(img_pil)
+    return photo
+
+def rgb_array_image(array):
+    """Image de PIL que comparte memoria con un array RGB contiguo (sin copiar píxeles)."""
+    height, width = array.shape[:2]
+    return Image.frombuffer('RGB', (width, height), array, 'raw', 'RGB', 0, 1)
+
 def load_ui_assets():
-    """Carga las imágenes de ejemplo desde las rutas especificadas."""
+    """Carga las imágenes de ejemplo desde las rutas especificadas (ya como PhotoImage)."""
     global example_images, example_texts
     logger.info("INFO: Cargando imágenes de ejemplo para la GUI...")
     for name, path in EXAMPLE_IMG_PATHS.items():
         try:
-            img = cv2.imread(path)
+            img = load_photo_image(path)
             if img is not None:
                 example_images[name] = img
             else:
@@ -240,7 +371,7 @@ def load_ui_assets():
 
     for name, path in EXAMPLE_TXT_PATHS.items():
         try:
-            img = cv2.imread(path)
+            img = load_photo_image(path)
             if img is not None:
                 example_texts[name] = img
             else:
@@ -253,43 +384,19 @@ def display_example_images(class_name):
     """Muestra la imagen y texto de ejemplo para la clase dada."""
     global lblImgExample, lblTxtExample
 
-    img_to_show = example_images.get(class_name)
-    txt_to_show = example_texts.get(class_name)
-
-    # Mostrar imagen de ejemplo
-    if img_to_show is not None and lblImgExample:
-        try:
-            img_rgb = cv2.cvtColor(img_to_show, cv2.COLOR_BGR2RGB)
-            img_pil = Image.fromarray(img_rgb)
-            img_tk = ImageTk.PhotoImage(image=img_pil)
-            lblImgExample.configure(image=img_tk)
-            lblImgExample.image = img_tk # Guardar referencia
-        except Exception as e:
-            logger.error(f"ERROR: Mostrando imagen de ejemplo para {class_name}: {e}")
-    elif lblImgExample:
-        lblImgExample.configure(image='') # Limpiar si no hay imagen
-
-    # Mostrar texto de ejemplo
-    if txt_to_show is not None and lblTxtExample:
-        try:
-            txt_rgb = cv2.cvtColor(txt_to_show, cv2.COLOR_BGR2RGB)
-            txt_pil = Image.fromarray(txt_rgb)
-            txt_tk = ImageTk.PhotoImage(image=txt_pil)
-            lblTxtExample.configure(image=txt_tk)
-            lblTxtExample.image = txt_tk # Guardar referencia
-        except Exception as e:
-            logger.error(f"ERROR: Mostrando texto de ejemplo para {class_name}: {e}")
-    elif lblTxtExample:
-        lblTxtExample.configure(image='') # Limpiar si no hay texto
+    # PhotoImages precargados (las referencias viven en example_images/example_texts);
+    # '' limpia el Label si la clase no tiene imagen
+    if lblImgExample:
+        lblImgExample.configure(image=example_images.get(class_name, ''))
+    if lblTxtExample:
+        lblTxtExample.configure(image=example_texts.get(class_name, ''))
 
 def clear_example_images():
     """Limpia las etiquetas de imágenes de ejemplo en la GUI."""
     if lblImgExample:
         lblImgExample.configure(image='')
-        lblImgExample.image = None
     if lblTxtExample:
         lblTxtExample.configure(image='')
-        lblTxtExample.image = None
 
 # --- Funciones de Interfaz de Usuario Mejoradas ---
 def update_status_indicators():
@@ -316,14 +423,17 @@ def update_status_indicators():
         count = processing_stats['detection_counts'].get(class_name, 0)
         label.config(text=f"{class_name}: {count}")
         
-    # Actualizar indicadores de nivel de llenado (si existen)
+    # Actualizar indicadores de nivel de llenado con la última medición del hilo
+    # de monitoreo (sin E/S de los sensores en el hilo de Tkinter)
     if bin_level_labels and sensor_monitoring_active:
         try:
-            # Obtener los niveles actuales (lectura única)
-            bin_levels = sensor_controller.get_fill_levels(use_average=True, num_readings=1)
+            bin_levels = sensor_controller.last_levels
             
             # Actualizar cada etiqueta de nivel
             for bin_name, level in bin_levels.items():
+                label = bin_level_labels.get(bin_name)
+                if label is None:
+                    continue
                 if level is not None:
                     # Determinar color según nivel de llenado
                     if level > 80:
@@ -333,7 +443,6 @@ def update_status_indicators():
                     else:
                         color = "#44aa44"  # Verde (vacío)
                     
-                    label = bin_level_labels[bin_name]
                     label.config(text=f"Nivel: {level:.1f}%", fg=color)
                 else:
                     label.config(text="Nivel: Error", fg="gray")
@@ -487,26 +596,513 @@ def _handle_motor_sequence(target_position, class_name):
         # 4. ¡MUY IMPORTANTE! Liberar el flag para permitir nuevas detecciones.
         logger.info("THREAD: Liberando bandera 'motor_busy'.")
         motor_busy = False
-        # Usar after para actualizar la UI desde el hilo principal
-        if pantalla:
-            pantalla.after(10, update_status_indicators)
 
 # --- Procesamiento de Video Mejorado ---
+# --- Cámara ---
+def open_camera(camera_index):
+    """
+    Abre la cámara con un buffer de un solo frame, MJPG y la resolución de FRAME_WIDTH.
+    Devuelve el objeto de captura (comprobar isOpened()).
+    """
+    if sys.platform.startswith('linux'):
+        cap = cv2.VideoCapture(camera_index, cv2.CAP_V4L2)
+    elif sys.platform.startswith('win'):
+        cap = cv2.VideoCapture(camera_index, cv2.CAP_DSHOW)
+    else:
+        cap = cv2.VideoCapture(camera_index)
+    if not cap.isOpened():
+        return cap
+    
+    # Mantener solo el frame más reciente en el buffer del driver
+    cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+    # Pedir MJPG antes de la resolución: la mayoría de webcams dan 30 fps así, frente a YUYV
+    cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*'MJPG'))
+    cap.set(cv2.CAP_PROP_FRAME_WIDTH, FRAME_WIDTH)
+    cap.set(cv2.CAP_PROP_FRAME_HEIGHT, FRAME_HEIGHT)
+    cap.set(cv2.CAP_PROP_FPS, CAMERA_FPS)
+    
+    actual_width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+    actual_height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+    logger.info(f"Cámara {camera_index} abierta. Resolución: {actual_width}x{actual_height}")
+    return cap
+
+def pin_current_thread(role, nice=0):
+    """
+    Fija el hilo actual a los núcleos de CPU_AFFINITY[role] y, si nice es distinto
+    de 0, ajusta su prioridad. No hace nada si pin_cpus está desactivado o el
+    sistema no lo permite (solo Linux).
+    """
+    if not PIN_CPUS or not hasattr(os, 'sched_setaffinity'):
+        return
+    cores = {core for core in CPU_AFFINITY[role] if core < (os.cpu_count() or 1)}
+    if not cores:
+        logger.warning(f"No hay núcleos disponibles para el hilo '{role}'; no se fija su afinidad")
+        return
+    try:
+        # En Linux, pid 0 se refiere al hilo que hace la llamada
+        os.sched_setaffinity(0, cores)
+        logger.info(f"Hilo '{role}' fijado a los núcleos {sorted(cores)}")
+    except OSError as e:
+        logger.warning(f"No se pudo fijar la afinidad del hilo '{role}': {e}")
+    if nice:
+        try:
+            # os.nice también actúa solo sobre el hilo actual en Linux
+            os.nice(nice)
+        except OSError as e:
+            logger.warning(f"No se pudo cambiar la prioridad del hilo '{role}': {e}")
+
+# Estilo de las etiquetas de detección
+LABEL_FONT = cv2.FONT_HERSHEY_SIMPLEX
+LABEL_SCALE = 0.6
+LABEL_THICKNESS = 2
+LABEL_COLOR = (0, 255, 0)  # Verde
+
+# Etiquetas ya renderizadas por texto ('Metal 0.87'): como la confianza se muestra
+# con dos decimales hay como mucho 101 por clase
+_label_sprites = {}
+
+def _label_sprite(label_text):
+    """Devuelve la etiqueta renderizada (texto sobre fondo negro) como array RGB, creándola la primera vez."""
+    sprite = _label_sprites.get(label_text)
+    if sprite is None:
+        (w, h), baseline = cv2.getTextSize(label_text, LABEL_FONT, LABEL_SCALE, LABEL_THICKNESS)
+        sprite = np.zeros((h + baseline + 6, w + 1, 3), dtype=np.uint8)
+        cv2.putText(sprite, label_text, (0, h + 3), LABEL_FONT, LABEL_SCALE, LABEL_COLOR, LABEL_THICKNESS)
+        _label_sprites[label_text] = sprite
+    return sprite
+
+if NUMBA_AVAILABLE:
+    @njit(cache=True)
+    def draw_boxes(image, boxes, color, thickness):
+        """
+        Pinta en el sitio el contorno de todas las cajas (array Nx4 int32 de
+        x1, y1, x2, y2) escribiendo directamente los píxeles, hacia dentro de la caja.
+        """
+        height, width = image.shape[0], image.shape[1]
+        for i in range(boxes.shape[0]):
+            x1, y1 = max(boxes[i, 0], 0), max(boxes[i, 1], 0)
+            x2, y2 = min(boxes[i, 2], width - 1), min(boxes[i, 3], height - 1)
+            if x1 > x2 or y1 > y2:
+                continue
+            for t in range(thickness):
+                top, bottom = min(y1 + t, y2), max(y2 - t, y1)
+                left, right = min(x1 + t, x2), max(x2 - t, x1)
+                for x in range(x1, x2 + 1):
+                    for c in range(3):
+                        image[top, x, c] = color[c]
+                        image[bottom, x, c] = color[c]
+                for y in range(y1, y2 + 1):
+                    for c in range(3):
+                        image[y, left, c] = color[c]
+                        image[y, right, c] = color[c]
+
+def draw_detections(image, boxes, cls_names, confs):
+    """
+    Dibuja en el sitio las cajas (array Nx4 int32 de x1, y1, x2, y2 ya dentro de
+    la imagen) de una sola vez (kernel de Numba o, sin Numba, una llamada a
+    cv2.polylines), y copia encima de cada caja su etiqueta precalculada (sin putText por frame).
+    """
+    if len(boxes) == 0:
+        return
+    if NUMBA_AVAILABLE:
+        draw_boxes(image, boxes, LABEL_COLOR, 2)
+    else:
+        # Esquinas (x1,y1) (x2,y1) (x2,y2) (x1,y2) de cada caja
+        corners = boxes[:, [0, 1, 2, 1, 2, 3, 0, 3]].reshape(-1, 4, 2)
+        cv2.polylines(image, corners, True, LABEL_COLOR, 2)
+    
+    image_height, image_width = image.shape[:2]
+    get_sprite = _label_sprite
+    for (x1, y1, _, _), cls_name, conf in zip(boxes.tolist(), cls_names, confs):
+        sprite = get_sprite(f'{cls_name} {conf:.2f}')
+        sprite_height, sprite_width = sprite.shape[:2]
+        # La etiqueta va justo encima de la caja, recortada a los bordes de la imagen
+        top = y1 - sprite_height
+        y0, y_end = max(top, 0), min(y1, image_height)
+        x_end = min(x1 + sprite_width, image_width)
+        if y0 < y_end and x1 < x_end:
+            image[y0:y_end, x1:x_end] = sprite[y0 - top:y_end - top, :x_end - x1]
+
+def resize_to_width(frame, width, dst=None):
+    """
+    Redimensiona el frame a `width` píxeles de ancho conservando la proporción.
+    Si dst tiene el tamaño de salida se escribe en él (sin reservar memoria);
+    devuelve el array redimensionado.
+    """
+    height = int(frame.shape[0] * width / frame.shape[1])
+    if dst is None or dst.shape != (height, width) + frame.shape[2:]:
+        dst = np.empty((height, width) + frame.shape[2:], dtype=frame.dtype)
+    return cv2.resize(frame, (width, height), dst=dst, interpolation=cv2.INTER_AREA)
+
+# --- Carga del Modelo ---
+# Ruta del modelo exportado respecto al .pt para cada formato
+EXPORTED_MODEL_SUFFIXES = {
+    'onnx': '.onnx',
+    'engine': '.engine',
+    'openvino': '_openvino_model',
+}
+
+def export_tag(imgsz, batch, precision):
+    """
+    Sufijo con los parámetros de exportación (p. ej. '320_b1_fp32'): un modelo
+    exportado solo se reutiliza si se generó con el mismo tamaño, lote y precisión.
+    """
+    return f"{imgsz}_b{batch}_{precision.lower()}"
+
+def export_model(model_path, model_format, imgsz, batch=1):
+    """
+    Exporta el modelo .pt al formato indicado junto al original (con batch dinámico
+    si batch > 1), con los parámetros en el nombre (models/best_320_b1_fp32.onnx).
+    Si ese modelo exportado ya existe se reutiliza; al cambiar inference_imgsz o
+    inference_batch se exporta uno nuevo. Devuelve su ruta o None si no es posible.
+    """
+    precision = 'FP16' if model_format == 'engine' else 'FP32'
+    exported_path = (f"{os.path.splitext(model_path)[0]}_{export_tag(imgsz, batch, precision)}"
+                     f"{EXPORTED_MODEL_SUFFIXES[model_format]}")
+    if os.path.exists(exported_path):
+        logger.info(f"Usando modelo {model_format} existente: {exported_path}")
+        return exported_path
+    
+    try:
+        logger.info(f"Exportando {model_path} a {model_format} (puede tardar varios minutos)...")
+        output_path = YOLO(model_path).export(
+            format=model_format,
+            imgsz=imgsz,
+            half=model_format == 'engine',  # FP16 solo en TensorRT; en CPU se mantiene FP32
+            batch=batch,
+            dynamic=batch > 1  # Lotes parciales cuando la cámara no llena el batch
+        )
+        # Ultralytics siempre escribe models/best<sufijo>: renombrarlo con sus parámetros
+        os.replace(output_path, exported_path)
+        logger.info(f"Modelo exportado en {exported_path}")
+        return exported_path
+    except Exception as e:
+        logger.warning(f"No se pudo exportar a {model_format}, se usará el modelo original: {e}")
+        return None
+
+def quantized_model_path(model_path, imgsz, batch=1):
+    """
+    Ruta del modelo ONNX cuantizado a INT8 para estos parámetros de exportación
+    (p. ej. models/best_320_b1_int8.onnx): con otro imgsz o lote se vuelve a cuantizar.
+    """
+    return f"{os.path.splitext(model_path)[0]}_{export_tag(imgsz, batch, 'INT8')}.onnx"
+
+def collect_calibration_frames(cap, num_frames=CALIBRATION_FRAMES):
+    """Lee hasta num_frames frames de la cámara para calibrar la cuantización."""
+    frames = []
+    for _ in range(num_frames):
+        ret, frame = cap.read()
+        if not ret:
+            break
+        frames.append(frame)
+    logger.info(f"{len(frames)} frames capturados para la calibración INT8")
+    return frames
+
+def _letterbox(frame, imgsz):
+    """Redimensiona el frame a imgsz x imgsz conservando la proporción (relleno gris, como YOLO)."""
+    height, width = frame.shape[:2]
+    scale = min(imgsz / width, imgsz / height)
+    new_width, new_height = round(width * scale), round(height * scale)
+    canvas = np.full((imgsz, imgsz, 3), 114, dtype=np.uint8)
+    top, left = (imgsz - new_height) // 2, (imgsz - new_width) // 2
+    canvas[top:top + new_height, left:left + new_width] = cv2.resize(
+        frame, (new_width, new_height), interpolation=cv2.INTER_LINEAR)
+    return canvas
+
+def quantize_model(onnx_path, output_path, frames, imgsz):
+    """
+    Cuantiza estáticamente a INT8 (pesos y activaciones) un modelo ONNX con
+    ONNX Runtime, calibrando con los frames dados, y lo guarda en output_path.
+    Devuelve output_path o None si no es posible.
+    """
+    try:
+        import onnxruntime
+        from onnxruntime.quantization import (CalibrationDataReader, QuantFormat,
+                                              QuantType, quantize_static)
+    except ImportError:
+        logger.warning("onnxruntime no está instalado; no se cuantizará el modelo")
+        return None
+    # onnxruntime.quantization importa onnx solo al cuantizar: comprobarlo antes
+    try:
+        import onnx
+    except ImportError:
+        logger.warning("El paquete onnx no está instalado (pip install onnx); no se cuantizará el modelo")
+        return None
+    
+    if not frames:
+        logger.warning("No hay frames de calibración; no se cuantizará el modelo")
+        return None
+    
+    input_name = onnxruntime.InferenceSession(
+        onnx_path, providers=['CPUExecutionProvider']).get_inputs()[0].name
+    
+    class FrameDataReader(CalibrationDataReader):
+        """Entrega los frames preprocesados como YOLO (RGB, NCHW, float32 en [0, 1])."""
+        def __init__(self):
+            self._frames = iter(frames)
+        
+        def get_next(self):
+            frame = next(self._frames, None)
+            if frame is None:
+                return None
+            image = cv2.cvtColor(_letterbox(frame, imgsz), cv2.COLOR_BGR2RGB)
+            tensor = image.transpose(2, 0, 1)[np.newaxis].astype(np.float32) / 255.0
+            return {input_name: tensor}
+    
+    try:
+        logger.info(f"Cuantizando {onnx_path} a INT8 con {len(frames)} frames de calibración...")
+        quantize_static(
+            onnx_path,
+            output_path,
+            FrameDataReader(),
+            quant_format=QuantFormat.QOperator,
+            weight_type=QuantType.QInt8,
+            activation_type=QuantType.QInt8
+        )
+        logger.info(f"Modelo INT8 generado en {output_path}")
+        return output_path
+    except Exception as e:
+        logger.warning(f"No se pudo cuantizar el modelo, se usará sin cuantizar: {e}")
+        return None
+
+def load_model(model_path, model_format, imgsz, quantize=False, cap=None, batch=1):
+    """
+    Carga el modelo YOLO. Si model_format es un formato exportable, exporta el .pt
+    una sola vez y carga el modelo exportado; si no, carga el .pt.
+    Con quantize=True y formato ONNX carga la versión INT8, generándola la primera
+    vez con frames de calibración leídos de cap.
+    """
+    if model_format in EXPORTED_MODEL_SUFFIXES and model_path.endswith('.pt'):
+        exported_path = export_model(model_path, model_format, imgsz, batch)
+        if exported_path and quantize:
+            if model_format != 'onnx':
+                logger.warning(f"La cuantización INT8 solo está disponible para ONNX, no para {model_format}")
+            else:
+                int8_path = quantized_model_path(model_path, imgsz, batch)
+                if os.path.exists(int8_path):
+                    exported_path = int8_path
+                elif cap is not None:
+                    frames = collect_calibration_frames(cap)
+                    exported_path = quantize_model(exported_path, int8_path, frames, imgsz) or exported_path
+        if exported_path:
+            if model_format == 'onnx':
+                detector = OnnxDetector.create(exported_path, imgsz)
+                if detector is not None:
+                    return detector
+            return YOLO(exported_path, task='detect')
+    
+    # Modelo PyTorch: fusionar Conv+BN una sola vez
+    model = YOLO(model_path)
+    model.fuse()
+    return model
+
+if NUMBA_AVAILABLE:
+    @njit(parallel=True, fastmath=True, cache=True)
+    def letterbox_to_chw(resized, dst, top, left):
+        """
+        Escribe en dst (1x3xHxW float32) el frame BGR ya redimensionado, centrado
+        con el relleno gris de YOLO, en RGB y normalizado a [0, 1], en una sola pasada.
+        """
+        height, width = dst.shape[2], dst.shape[3]
+        new_height, new_width = resized.shape[0], resized.shape[1]
+        pad = np.float32(114.0 / 255.0)
+        inv = np.float32(1.0 / 255.0)
+        for y in prange(height):
+            sy = y - top
+            for x in range(width):
+                sx = x - left
+                if 0 <= sy < new_height and 0 <= sx < new_width:
+                    dst[0, 0, y, x] = resized[sy, sx, 2] * inv
+                    dst[0, 1, y, x] = resized[sy, sx, 1] * inv
+                    dst[0, 2, y, x] = resized[sy, sx, 0] * inv
+                else:
+                    dst[0, 0, y, x] = pad
+                    dst[0, 1, y, x] = pad
+                    dst[0, 2, y, x] = pad
+
+def warmup_model(model, imgsz, batch=1, iterations=3):
+    """
+    Ejecuta unas inferencias con frames negros para pagar al arrancar la
+    inicialización perezosa (predictor, kernels CUDA, sesión ONNX) en lugar
+    de en los primeros frames reales.
+    """
+    dummy_frame = np.zeros((FRAME_HEIGHT, FRAME_WIDTH, 3), dtype=np.uint8)
+    try:
+        start_time = time.time()
+        for i in range(iterations):
+            iteration_start = time.time()
+            if isinstance(model, OnnxDetector):
+                model.predict(dummy_frame, 1.0)
+            else:
+                with torch.inference_mode():
+                    model.predict([dummy_frame] * batch, imgsz=imgsz, verbose=False)
+            # El tiempo debe estabilizarse tras la primera iteración; si no, faltan iteraciones
+            logger.debug(f"Calentamiento {i + 1}/{iterations}: {(time.time() - iteration_start) * 1000:.1f} ms")
+        logger.info(f"Modelo calentado en {time.time() - start_time:.2f}s")
+    except Exception as e:
+        logger.warning(f"No se pudo calentar el modelo: {e}")
+
+class OnnxDetector:
+    """
+    Inferencia directa de un YOLOv8 exportado a ONNX con ONNX Runtime, sin el
+    predictor de ultralytics: la sesión, el tensor de entrada y el lienzo del
+    letterbox se crean una sola vez y las cajas se decodifican con numpy.
+    """
+    IOU_THRESHOLD = 0.45  # Umbral de solapamiento del NMS (el de ultralytics por defecto)
+    
+    @classmethod
+    def create(cls, onnx_path, imgsz):
+        """Devuelve un OnnxDetector para onnx_path, o None si onnxruntime no está disponible."""
+        try:
+            import onnxruntime
+        except ImportError:
+            logger.warning("onnxruntime no está instalado; se usará el predictor de ultralytics")
+            return None
+        try:
+            return cls(onnxruntime, onnx_path, imgsz)
+        except Exception as e:
+            logger.warning(f"No se pudo crear la sesión de ONNX Runtime, se usará el predictor de ultralytics: {e}")
+            return None
+    
+    def __init__(self, onnxruntime, onnx_path, imgsz):
+        options = onnxruntime.SessionOptions()
+        options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+        providers = [provider for provider in ('CUDAExecutionProvider', 'CPUExecutionProvider')
+                     if provider in onnxruntime.get_available_providers()]
+        self.session = onnxruntime.InferenceSession(onnx_path, sess_options=options, providers=providers)
+        
+        model_input = self.session.get_inputs()[0]
+        self.input_name = model_input.name
+        # Con exportación dinámica las dimensiones son simbólicas: usar imgsz
+        height, width = model_input.shape[2:4]
+        self.input_height = height if isinstance(height, int) else imgsz
+        self.input_width = width if isinstance(width, int) else imgsz
+        
+        # Buffers reutilizados en cada frame
+        self.input_tensor = np.empty((1, 3, self.input_height, self.input_width), dtype=np.float32)
+        self.canvas = np.full((self.input_height, self.input_width, 3), 114, dtype=np.uint8)
+        self._frame_shape = None
+        logger.info(f"Sesión de ONNX Runtime creada para {onnx_path} ({', '.join(self.session.get_providers())})")
+    
+    def _set_geometry(self, frame_shape):
+        """Calcula (una vez por resolución) la escala y el relleno del letterbox."""
+        height, width = frame_shape[:2]
+        self.scale = min(self.input_width / width, self.input_height / height)
+        new_width, new_height = round(width * self.scale), round(height * self.scale)
+        self.pad_left = (self.input_width - new_width) // 2
+        self.pad_top = (self.input_height - new_height) // 2
+        self.resized = np.empty((new_height, new_width, 3), dtype=np.uint8)
+        self.canvas[:] = 114
+        self._frame_shape = frame_shape
+    
+    def preprocess(self, frame):
+        """Letterbox del frame BGR y conversión a tensor RGB NCHW float32 en [0, 1]."""
+        if frame.shape != self._frame_shape:
+            self._set_geometry(frame.shape)
+        new_height, new_width = self.resized.shape[:2]
+        cv2.resize(frame, (new_width, new_height), dst=self.resized, interpolation=cv2.INTER_LINEAR)
+        if NUMBA_AVAILABLE:
+            letterbox_to_chw(self.resized, self.input_tensor, self.pad_top, self.pad_left)
+            return self.input_tensor
+        self.canvas[self.pad_top:self.pad_top + new_height, self.pad_left:self.pad_left + new_width] = self.resized
+        np.divide(self.canvas[..., ::-1].transpose(2, 0, 1), 255.0, out=self.input_tensor[0])
+        return self.input_tensor
+    
+    def predict(self, frame, conf):
+        """
+        Detecta objetos en un frame BGR.
+        
+        Returns:
+            tuple: (xyxy int32 Nx4 en coordenadas del frame, confianzas N, clases int32 N),
+                   ordenadas por confianza descendente
+        """
+        output = self.session.run(None, {self.input_name: self.preprocess(frame)})[0][0]
+        # Salida YOLOv8: (4 + num_clases, anclas) con cajas cx, cy, w, h en píxeles de entrada
+        scores = output[4:]
+        classes = scores.argmax(axis=0)
+        confidences = scores[classes, np.arange(scores.shape[1])]
+        mask = confidences >= conf
+        if not mask.any():
+            return np.empty((0, 4), dtype=np.int32), np.empty(0, dtype=np.float32), np.empty(0, dtype=np.int32)
+        
+        cx, cy, w, h = output[:4, mask]
+        confidences, classes = confidences[mask], classes[mask]
+        
+        # Deshacer el letterbox: a coordenadas del frame original
+        x1 = (cx - w / 2 - self.pad_left) / self.scale
+        y1 = (cy - h / 2 - self.pad_top) / self.scale
+        boxes_xywh = np.stack([x1, y1, w / self.scale, h / self.scale], axis=1)
+        
+        # NMS por clase
+        keep = cv2.dnn.NMSBoxesBatched(boxes_xywh.tolist(), confidences.tolist(), classes.tolist(),
+                                       conf, self.IOU_THRESHOLD)
+        keep = np.asarray(keep, dtype=np.int64).reshape(-1)
+        keep = keep[np.argsort(-confidences[keep])]
+        
+        boxes_xywh = boxes_xywh[keep]
+        xyxy = np.empty((len(keep), 4), dtype=np.int32)
+        xyxy[:, :2] = boxes_xywh[:, :2]
+        xyxy[:, 2:] = boxes_xywh[:, :2] + boxes_xywh[:, 2:]
+        return xyxy, confidences[keep], classes[keep].astype(np.int32)
+
+class Detection:
+    """
+    Detección válida de un frame, tal como la reciben los callbacks: caja
+    (x1, y1, x2, y2), confianza, índice y nombre de la clase. Usa __slots__
+    (sin __dict__ por instancia).
+    """
+    __slots__ = ('box', 'conf', 'cls_index', 'cls_name')
+    
+    def __init__(self, box, conf, cls_index, cls_name):
+        self.box = box
+        self.conf = conf
+        self.cls_index = cls_index
+        self.cls_name = cls_name
+    
+    def __repr__(self):
+        return f"Detection({self.cls_name}, conf={self.conf:.2f}, box={self.box})"
+
 class FrameProcessor:
-    """Clase para manejar el procesamiento de frames de video de forma eficiente."""
-    def __init__(self, buffer_size=5, skip_frames=2):
+    """
+    Clase para manejar el procesamiento de frames de video de forma eficiente.
+    
+    Los frames viven en un anillo de arrays reutilizables (slots): la captura
+    escribe en un slot libre, y hacia la inferencia y el dibujo solo circulan
+    índices. El slot vuelve a estar libre cuando DrawThread termina con él o
+    cuando se descarta por llegar otro más reciente, así que no se copia
+    ningún frame entre hilos.
+    
+    La entrada a la inferencia es un hueco "el último gana" con sitio para un
+    lote: la captura deja ahí los frames más recientes y la inferencia se los
+    lleva todos de una vez.
+    """
+    def __init__(self, buffer_size=2, batch_size=1):
         """
         Inicializar el procesador de frames.
         
         Args:
-            buffer_size: Tamaño del buffer de frames
-            skip_frames: Número de frames a saltar entre detecciones (para reducir carga)
+            buffer_size: Tamaño del buffer de frames (entrada) y de la cola de dibujo (salida)
+            batch_size: Máximo de frames por llamada al modelo
         """
-        self.frame_buffer = queue.Queue(maxsize=buffer_size)
+        self.batch_size = batch_size
+        self._pending = []  # Índices de slots listos para inferencia (como mucho batch_size, los más recientes)
+        self._pending_lock = threading.Lock()
+        self._pending_ready = threading.Event()
+        self.draw_queue = queue.Queue(maxsize=buffer_size)  # (índice, arrays de detecciones) para DrawThread
+        
+        # Slots suficientes para un lote pendiente, la cola de dibujo, uno en
+        # captura, un lote en inferencia y uno en dibujo. Los arrays se crean con
+        # el primer frame (cap.retrieve los reserva con la resolución real de la cámara)
+        num_slots = 2 * batch_size + buffer_size + 2
+        self.slots = [None] * num_slots
+        self.free_slots = queue.Queue()
+        for index in range(num_slots):
+            self.free_slots.put_nowait(index)
+        
+        self.min_confidence = MIN_CONFIDENCE  # Se lee en cada lote: puede cambiarse en marcha
         self.last_processed_frame = None
-        self.last_detections = []  # Lista de todas las detecciones válidas del último frame
-        self.skip_frames = skip_frames
-        self.frame_counter = 0
+        self.last_detections = self._to_arrays(  # Arrays de detecciones del último frame (ver _to_arrays)
+            np.empty((0, 4), np.int32), np.empty(0, np.float32), np.empty(0, np.int32))
         self.processing_thread = None
         self.processing_active = False
         self.is_running = False  # Estado para verificar si está activo
@@ -520,11 +1116,12 @@ class FrameProcessor:
             min_confidence: Umbral de confianza para detecciones
             callback: Función a llamar con los resultados de la detección
         """
+        self.min_confidence = min_confidence
         self.processing_active = True
         self.is_running = True
         self.processing_thread = threading.Thread(
             target=self._process_frames_loop,
-            args=(model, min_confidence, callback),
+            args=(model, callback),
             daemon=True
         )
         self.processing_thread.start()
@@ -539,122 +1136,468 @@ class FrameProcessor:
             logger.info("Hilo de procesamiento de frames detenido")
         self.is_running = False
         
+    def acquire_slot(self):
+        """
+        Devuelve el índice de un slot libre para escribir un frame. Si no hay
+        ninguno, recupera el frame más antiguo pendiente de inferencia.
+        """
+        while True:
+            try:
+                return self.free_slots.get_nowait()
+            except queue.Empty:
+                pass
+            with self._pending_lock:
+                if self._pending:
+                    return self._pending.pop(0)
+            try:
+                return self.free_slots.get(timeout=0.01)
+            except queue.Empty:
+                pass
+    
+    def release_slot(self, index):
+        """Devuelve un slot al anillo de slots libres."""
+        self.free_slots.put_nowait(index)
+    
+    def _put_slot(self, q, item):
+        """Encola item (una tupla que empieza por el índice del slot) descartando y liberando el más antiguo si la cola está llena."""
+        while True:
+            try:
+                q.put_nowait(item)
+                return
+            except queue.Full:
+                try:
+                    dropped = q.get_nowait()
+                except queue.Empty:
+                    continue
+                self.release_slot(dropped[0])
+    
+    def commit_slot(self, index, frame):
+        """
+        Publica para inferencia el frame escrito en el slot index. frame es el
+        array devuelto por cap.retrieve: si la resolución cambió será un array
+        nuevo y pasa a ser el del slot.
+        """
+        self.slots[index] = frame
+        with self._pending_lock:
+            self._pending.append(index)
+            dropped = self._pending.pop(0) if len(self._pending) > self.batch_size else None
+            self._pending_ready.set()
+        if dropped is not None:
+            self.release_slot(dropped)
+    
+    def wants_frames(self):
+        """True si el próximo lote de inferencia aún no está completo."""
+        return len(self._pending) < self.batch_size
+    
+    def take_batch(self, timeout):
+        """
+        Espera hasta timeout segundos a que haya frames pendientes y se los lleva
+        todos (como mucho batch_size). Devuelve la lista de índices (vacía si no hubo).
+        """
+        if not self._pending_ready.wait(timeout):
+            return []
+        with self._pending_lock:
+            indices, self._pending = self._pending, []
+            self._pending_ready.clear()
+        return indices
+    
     def add_frame(self, frame):
         """
         Añade un frame al buffer, sin bloquear si está lleno.
         
         Args:
-            frame: Frame de OpenCV a añadir
+            frame: Frame de OpenCV a añadir (pasa a pertenecer al procesador, no se copia)
         """
         try:
-            # Si el buffer está lleno, descartar el frame más antiguo
-            if self.frame_buffer.full():
-                try:
-                    self.frame_buffer.get_nowait()
-                except queue.Empty:
-                    pass  # Ya vacío (improbable)
-            
-            # Añadir el nuevo frame
-            self.frame_buffer.put_nowait(frame.copy())
+            self.commit_slot(self.acquire_slot(), frame)
         except Exception as e:
             logger.warning(f"Error añadiendo frame al buffer: {e}")
     
-    def _process_frames_loop(self, model, min_confidence, callback):
+    @staticmethod
+    def _to_arrays(xyxy, confs, classes):
         """
-        Bucle de procesamiento de frames en segundo plano.
+        Agrupa las detecciones de un frame (ya filtradas por confianza y ordenadas)
+        en un diccionario de arrays: 'boxes' (N, 4) int32 recortadas a >= 0,
+        'confs' (N,) float32 y 'cls_idx' (N,) int32. Descarta las clases no válidas.
+        """
+        valid = (classes >= 0) & (classes < NUM_CLASSES)
+        if not valid.all():
+            xyxy, confs, classes = xyxy[valid], confs[valid], classes[valid]
+        boxes = np.clip(xyxy.astype(np.int32), 0, None)
+        return {
+            'boxes': boxes,
+            'confs': confs.astype(np.float32, copy=False),
+            'cls_idx': classes.astype(np.int32, copy=False),
+        }
+    
+    @staticmethod
+    def _to_detections(arrays):
+        """Convierte los arrays de un frame en la lista de Detection de los callbacks."""
+        return [
+            Detection(box, conf, cls_index, CLASS_NAMES[cls_index])
+            for box, conf, cls_index in zip(arrays['boxes'].tolist(), arrays['confs'].tolist(),
+                                            arrays['cls_idx'].tolist())
+        ]
+    
+    def _detect(self, model, frames, min_confidence):
+        """
+        Ejecuta el modelo sobre un lote de frames.
+        
+        Returns:
+            list: Para cada frame, los arrays de sus detecciones válidas ordenadas
+            por confianza, de mayor a menor (ver _to_arrays)
+        """
+        if isinstance(model, OnnxDetector):
+            # Inferencia directa con ONNX Runtime (ya filtrada, con NMS y ordenada), frame a frame
+            return [self._to_arrays(*model.predict(frame, min_confidence)) for frame in frames]
+        
+        # Procesar el lote con YOLO en una sola llamada (el umbral de confianza se aplica dentro de predict)
+        with torch.inference_mode():
+            results = model.predict(frames, imgsz=INFERENCE_IMGSZ, conf=min_confidence, verbose=False)
+        
+        # Obtener detecciones válidas: una conversión a numpy por resultado
+        # en lugar de una conversión tensor -> escalar por caja
+        batch_detections = []
+        for res in results:
+            confs = res.boxes.conf.cpu().numpy()
+            mask = confs >= min_confidence
+            confs = confs[mask]
+            order = np.argsort(-confs)
+            xyxy = res.boxes.xyxy.cpu().numpy()[mask].astype(np.int32)
+            classes = res.boxes.cls.cpu().numpy()[mask].astype(np.int32)
+            batch_detections.append(self._to_arrays(xyxy[order], confs[order], classes[order]))
+        return batch_detections
+    
+    def _process_frames_loop(self, model, callback):
+        """
+        Bucle de procesamiento de frames en segundo plano (el umbral de
+        confianza es self.min_confidence).
         
         Args:
             model: Modelo YOLO
-            min_confidence: Umbral de confianza
             callback: Función a llamar con resultados
         """
+        pin_current_thread('inference', nice=INFERENCE_NICE)
         while self.processing_active:
+            indices = []  # Slots en uso por este hilo (se liberan si falla la inferencia)
             try:
-                # Obtener frame del buffer, esperar hasta 100ms
-                try:
-                    frame = self.frame_buffer.get(timeout=0.1)
-                except queue.Empty:
+                # Llevarse los frames pendientes (un lote, quizá parcial), esperar hasta 100ms
+                indices = self.take_batch(timeout=0.1)
+                if not indices:
                     continue  # No hay frames, verificar si seguimos activos
+                frames = [self.slots[index] for index in indices]
                 
-                # Incrementar contador y saltar frames según configuración
-                self.frame_counter += 1
-                if self.frame_counter % (self.skip_frames + 1) != 0:
-                    continue  # Saltar este frame
+                batch_detections = self._detect(model, frames, self.min_confidence)
                 
-                # Procesar frame con YOLO
-                results = model(frame, stream=True, verbose=False)
+                # Guardar referencias (sin copia: el slot se reutiliza cuando DrawThread lo libera)
+                for index, frame, arrays in zip(indices, frames, batch_detections):
+                    self.last_processed_frame = frame
+                    self.last_detections = arrays
+                    self._put_slot(self.draw_queue, (index, arrays))
+                indices = []
                 
-                # Lista para almacenar todas las detecciones válidas
-                all_detections = []
+                # Llamar al callback con la mejor detección (si hay) y todas las detecciones
+                for arrays in batch_detections:
+                    all_detections = self._to_detections(arrays)
+                    best_detection = all_detections[0] if all_detections else None
+                    callback(best_detection, all_detections)
                 
-                # Obtener detecciones válidas
-                for res in results:
-                    boxes = res.boxes
-                    for box in boxes:
-                        conf = float(box.conf[0])
-                        if conf >= min_confidence:
-                            cls_index = int(box.cls[0])
-                            # Verificar si el índice es válido
-                            if 0 <= cls_index < len(CLASS_NAMES):
-                                detection = {
-                                    'box': list(map(int, box.xyxy[0])),
-                                    'conf': conf,
-                                    'cls_index': cls_index,
-                                    'cls_name': CLASS_NAMES[cls_index]
-                                }
-                                all_detections.append(detection)
+            except Exception as e:
+                logger.error(f"Error en hilo de procesamiento de frames: {e}")
+                for index in indices:
+                    self.release_slot(index)
+
+class CaptureThread(threading.Thread):
+    """
+    Hilo que lee frames de la cámara y deja siempre el más reciente en la cola
+    de entrada del FrameProcessor. Reconecta la cámara si deja de responder.
+    
+    Estado (self.state): HEALTHY mientras lee, RECONNECTING durante los
+    reintentos y DEAD si la cámara no se recupera (el hilo termina; para volver
+    a intentarlo se crea un hilo nuevo, ver AppGUI.reconnect_camera).
+    """
+    MAX_CAMERA_RETRIES = 5
+    RECONNECT_COOLDOWN = 1.0  # Segundos entre liberar la cámara y volver a abrirla
+    
+    HEALTHY = 'HEALTHY'
+    RECONNECTING = 'RECONNECTING'
+    DEAD = 'DEAD'
+    
+    def __init__(self, cap, frame_processor, on_error=None):
+        """
+        Args:
+            cap: Objeto de captura de OpenCV ya abierto (None para abrirla al arrancar)
+            frame_processor: FrameProcessor en cuyos slots se escriben los frames
+            on_error: Función a llamar (sin argumentos) si la cámara no se puede recuperar
+        """
+        super().__init__(name="capture", daemon=True)
+        self.cap = cap
+        self.frame_processor = frame_processor
+        self.on_error = on_error
+        self.stop_event = threading.Event()
+        self.state = self.HEALTHY
+    
+    def stop(self):
+        """Detiene el hilo y libera la cámara."""
+        self.stop_event.set()
+        if self.is_alive():
+            self.join(timeout=1.0)
+        if self.cap is not None:
+            self.cap.release()
+    
+    def _reconnect(self):
+        """
+        Intenta reabrir la cámara hasta MAX_CAMERA_RETRIES veces, esperando
+        RECONNECT_COOLDOWN antes de cada intento. Devuelve True si lo consigue.
+        """
+        self.state = self.RECONNECTING
+        # Liberar la cámara una sola vez; cada intento fallido libera su propia captura
+        if self.cap is not None:
+            self.cap.release()
+            self.cap = None
+        
+        for attempt in range(1, self.MAX_CAMERA_RETRIES + 1):
+            if self.stop_event.wait(self.RECONNECT_COOLDOWN):
+                return False
+            try:
+                cap = open_camera(CAMERA_INDEX)
+                if cap.isOpened():
+                    self.cap = cap
+                    self.state = self.HEALTHY
+                    logger.info("Cámara reconectada exitosamente.")
+                    return True
+                cap.release()
+                logger.warning(f"Reintento {attempt}/{self.MAX_CAMERA_RETRIES} fallido. Esperando antes de volver a intentar...")
+            except Exception as e:
+                logger.error(f"Error al reconectar cámara: {e}. Reintento {attempt}/{self.MAX_CAMERA_RETRIES}")
+        
+        self.state = self.DEAD
+        logger.critical(f"Se alcanzó el máximo de {self.MAX_CAMERA_RETRIES} reintentos de reconexión de cámara. Deteniendo escaneo.")
+        return False
+    
+    def run(self):
+        pin_current_thread('capture')
+        read_failures = 0
+        processor = self.frame_processor
+        if self.cap is None or not self.cap.isOpened():
+            if not self._reconnect():
+                if self.on_error and not self.stop_event.is_set():
+                    self.on_error()
+                return
+        while not self.stop_event.is_set():
+            # grab() solo saca el frame del driver; se decodifica (retrieve) únicamente
+            # cuando la inferencia necesita más frames para su próximo lote, así
+            # los frames descartados no cuestan nada
+            ret = self.cap.grab()
+            if ret and processor.wants_frames():
+                # Decodificar directamente en un slot libre (sin reservar un array por frame)
+                index = processor.acquire_slot()
+                ret, frame = self.cap.retrieve(processor.slots[index])
+                if ret:
+                    processor.commit_slot(index, frame)
+                else:
+                    processor.release_slot(index)
+            if ret:
+                read_failures = 0
+                continue
+            
+            logger.error("No se pudo capturar frame de la cámara.")
+            read_failures += 1
+            if read_failures < self.MAX_CAMERA_RETRIES:
+                self.stop_event.wait(0.5)
+                continue
+            
+            logger.critical(f"Se alcanzó el máximo de {self.MAX_CAMERA_RETRIES} reintentos de captura de frame. Reconectando cámara...")
+            read_failures = 0
+            if not self._reconnect():
+                if self.on_error and not self.stop_event.is_set():
+                    self.on_error()
+                return
+
+class DrawThread(threading.Thread):
+    """
+    Hilo que dibuja las detecciones sobre los frames ya procesados y prepara la
+    imagen para la GUI. Solo el intercambio de la imagen en el Label se hace en
+    el hilo de Tkinter (AppGUI.show_frame).
+    
+    La vista previa se escribe en buffers RGB preasignados que comparten memoria
+    con su Image de PIL: cada frame es un resize directo al buffer y un cambio
+    BGR->RGB en el sitio, sin arrays intermedios.
+    
+    Si la escena no cambia (miniatura en grises casi igual a la del último frame
+    mostrado) y las detecciones son las mismas cajas y clases que las ya
+    mostradas, el frame no se redibuja. Los frames omitidos cuentan igualmente
+    para los FPS (AppGUI.update_frame_stats), que miden la inferencia y no los
+    refrescos de la vista previa.
+    """
+    NUM_PREVIEW_BUFFERS = 3  # Uno en dibujo, uno pendiente de mostrar y uno mostrándose
+    STATIC_THUMB_SIZE = (80, 60)  # Miniatura usada para comparar frames
+    STATIC_THRESHOLD = 2.0        # Diferencia media por píxel (0-255) por debajo de la cual la escena es la misma
+    STATIC_REFRESH_S = 1.0        # Aun con la escena estática, redibujar al menos cada segundo
+    
+    def __init__(self, frame_processor, gui):
+        """
+        Args:
+            frame_processor: FrameProcessor cuya cola de dibujo se consume
+            gui: Instancia de AppGUI donde se muestran los frames
+        """
+        super().__init__(name="draw", daemon=True)
+        self.frame_processor = frame_processor
+        self.gui = gui
+        self.stop_event = threading.Event()
+        self._preview_size = None
+        self._free_buffers = queue.Queue()
+        thumb_width, thumb_height = self.STATIC_THUMB_SIZE
+        self._thumb = np.empty((thumb_height, thumb_width, 3), dtype=np.uint8)
+        self._thumb_gray = np.empty((thumb_height, thumb_width), dtype=np.uint8)
+        self._shown_gray = np.empty((thumb_height, thumb_width), dtype=np.uint8)
+        self._shown_time = None             # Momento en que se mostró _shown_gray (None: nunca)
+        self._shown_boxes = None            # Cajas y clases dibujadas en el último frame mostrado
+        self._shown_classes = None
+    
+    def stop(self):
+        """Detiene el hilo."""
+        self.stop_event.set()
+        if self.is_alive():
+            self.join(timeout=1.0)
+    
+    def _allocate_buffers(self, size):
+        """Crea los buffers (array RGB, Image que lo comparte) para una vista previa de tamaño size."""
+        width, height = size
+        self._preview_size = size
+        self._free_buffers = queue.Queue()
+        for _ in range(self.NUM_PREVIEW_BUFFERS):
+            rgb = np.empty((height, width, 3), dtype=np.uint8)
+            pil = rgb_array_image(rgb)
+            self._free_buffers.put_nowait((rgb, pil))
+    
+    def _release_buffer(self, buffer):
+        """Devuelve un buffer cuando la GUI ya lo ha mostrado (se descarta si cambió el tamaño)."""
+        if buffer[1].size == self._preview_size:
+            self._free_buffers.put_nowait(buffer)
+    
+    def _is_static(self, frame):
+        """
+        Compara la miniatura en grises del frame con la del último frame mostrado.
+        Deja la del frame en _thumb_gray (ver _mark_shown).
+        """
+        cv2.resize(frame, self.STATIC_THUMB_SIZE, dst=self._thumb, interpolation=cv2.INTER_AREA)
+        cv2.cvtColor(self._thumb, cv2.COLOR_BGR2GRAY, dst=self._thumb_gray)
+        if self._shown_time is None or time.monotonic() - self._shown_time >= self.STATIC_REFRESH_S:
+            return False
+        difference = cv2.norm(self._thumb_gray, self._shown_gray, cv2.NORM_L1) / self._thumb_gray.size
+        return difference < self.STATIC_THRESHOLD
+    
+    def _same_detections(self, arrays):
+        """True si las cajas y clases son exactamente las del último frame mostrado."""
+        return (self._shown_boxes is not None
+                and np.array_equal(arrays['boxes'], self._shown_boxes)
+                and np.array_equal(arrays['cls_idx'], self._shown_classes))
+    
+    def _mark_shown(self, arrays):
+        """Toma el frame actual (miniatura y detecciones) como referencia del último frame mostrado."""
+        np.copyto(self._shown_gray, self._thumb_gray)
+        self._shown_time = time.monotonic()
+        self._shown_boxes = arrays['boxes']
+        self._shown_classes = arrays['cls_idx']
+    
+    def run(self):
+        pin_current_thread('draw')
+        frame_width = self.gui.config.get('frame_width')
+        processor = self.frame_processor
+        while not self.stop_event.is_set():
+            try:
+                index, arrays = processor.draw_queue.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            self.gui.update_frame_stats()
+            
+            try:
+                frame = processor.slots[index]
+                has_detections = len(arrays['boxes']) > 0
                 
-                # Ordenar detecciones por confianza (mayor a menor)
-                if all_detections:
-                    all_detections.sort(key=lambda x: x['conf'], reverse=True)
+                # Escena sin cambios y mismas detecciones que lo ya mostrado: no redibujar
+                # (el frame ya se contó en los FPS al sacarlo de la cola)
+                if self._is_static(frame) and self._same_detections(arrays):
+                    continue
                 
-                # Guardar referencias
-                self.last_processed_frame = frame.copy()
-                self.last_detections = all_detections
+                height, width = frame.shape[:2]
+                size = (frame_width, int(height * frame_width / width))
+                if size != self._preview_size:
+                    self._allocate_buffers(size)
                 
-                # Llamar al callback con la mejor detección (si hay) y todas las detecciones
-                best_detection = all_detections[0] if all_detections else None
-                if best_detection:
-                    best_detection['frame'] = frame.copy()
+                # Si la GUI aún no ha liberado ningún buffer va retrasada: descartar este frame
+                try:
+                    buffer = self._free_buffers.get(timeout=0.1)
+                except queue.Empty:
+                    continue
+                rgb, pil = buffer
+                
+                if USE_OPENCL:
+                    # Reducir y convertir en el dispositivo OpenCL y bajar solo la vista previa
+                    preview = cv2.cvtColor(cv2.resize(cv2.UMat(frame), size, interpolation=cv2.INTER_AREA),
+                                           cv2.COLOR_BGR2RGB)
+                    # get() espera a que terminen las operaciones: después el slot ya no se usa
+                    np.copyto(rgb, preview.get())
+                    processor.release_slot(index)
+                    index = None
+                else:
+                    # Reducir directamente al buffer y convertir a RGB en el sitio;
+                    # a partir de aquí el slot ya no se usa
+                    cv2.resize(frame, size, dst=rgb, interpolation=cv2.INTER_AREA)
+                    processor.release_slot(index)
+                    index = None
+                    cv2.cvtColor(rgb, cv2.COLOR_BGR2RGB, dst=rgb)
                 
-                callback(best_detection, all_detections)
+                # Dibujar cada detección (cajas en coordenadas del frame original)
+                if has_detections:
+                    boxes = (arrays['boxes'] * (frame_width / width)).astype(np.int32)
+                    draw_detections(rgb, boxes, [CLASS_NAMES[i] for i in arrays['cls_idx'].tolist()],
+                                    arrays['confs'].tolist())
                 
+                self.gui.show_frame(pil, on_done=lambda buffer=buffer: self._release_buffer(buffer))
+                self._mark_shown(arrays)
             except Exception as e:
-                logger.error(f"Error en hilo de procesamiento de frames: {e}")
+                logger.error(f"Error en hilo de dibujo: {e}")
+            finally:
+                if index is not None:
+                    processor.release_slot(index)
 
-# --- Modificar scanning_loop para usar las detecciones guardadas ---
 # Crear una instancia global del procesador
-frame_processor = FrameProcessor(buffer_size=5, skip_frames=1)
+frame_processor = FrameProcessor(buffer_size=2, batch_size=INFERENCE_BATCH)
 
 def detection_callback(best_detection, all_detections=None):
     """
     Callback que se llama cuando el procesador de frames tiene una detección.
     
     Args:
-        best_detection: La mejor detección (mayor confianza)
+        best_detection: La mejor Detection (mayor confianza) o None
         all_detections: Lista de todas las detecciones válidas
     """
-    global last_detected_class_index, motor_busy
+    global last_detected_class_index, last_displayed_class_index, motor_busy
 
     if best_detection:
         # Tenemos una detección
-        cls_index = best_detection['cls_index']
-        cls_name = best_detection['cls_name']
-        
-        # Mostrar la imagen de ejemplo asociada
-        display_example_images(cls_name)
-        
-        # Si el motor no está ocupado y es una nueva clase, activar motor
-        if not motor_busy and cls_index in TARGET_STEPS_MAP and cls_index != last_detected_class_index:
+        cls_index = best_detection.cls_index
+        cls_name = best_detection.cls_name
+        
+        # Mostrar la imagen de ejemplo asociada (solo si cambia la clase)
+        if cls_index != last_displayed_class_index:
+            display_example_images(cls_name)
+            last_displayed_class_index = cls_index
+        
+        # Si el motor no está ocupado y es una nueva clase con posición asignada, activar motor
+        # (comprobaciones baratas primero; una sola búsqueda en el mapa)
+        target_position = None
+        if not motor_busy and cls_index != last_detected_class_index:
+            target_position = TARGET_STEPS_MAP.get(cls_index)
+        if target_position is not None:
             motor_busy = True
-            update_status_indicators()
-            target_position = TARGET_STEPS_MAP[cls_index]
             logger.info(f"Detección válida: '{cls_name}'. Iniciando motor hacia {target_position} pasos.")
             
             # Actualizar contadores
             processing_stats['detection_counts'][cls_name] = processing_stats['detection_counts'].get(cls_name, 0) + 1
             processing_stats['total_detections'] += 1
-            update_status_indicators()
             
             # Iniciar hilo del motor
             motor_thread = threading.Thread(
@@ -670,7 +1613,7 @@ def detection_callback(best_detection, all_detections=None):
             # Nuevo: Actualizar adaptador web con la detección actual
             detection_data = {
                 'class_name': cls_name,
-                'confidence': best_detection['conf']
+                'confidence': best_detection.conf
             }
             # Actualizar adaptador web
             main_web_adapter.update_data(detection=detection_data)
@@ -678,6 +1621,7 @@ def detection_callback(best_detection, all_detections=None):
         # No hay detección, limpiar si no hay motor activo
         if not motor_busy and last_detected_class_index != -1:
             last_detected_class_index = -1
+            last_displayed_class_index = -1
             clear_example_images()
 
 def scanning_loop():
@@ -685,7 +1629,7 @@ def scanning_loop():
     Bucle principal modificado para usar el procesador de frames en segundo plano.
     """
     global last_detected_class_index, motor_busy, cap, model
-    global lblVideo
+    global lblVideo, preview_buffer, video_photo
     
     # Variables de seguimiento para reintentos de cámara
     MAX_CAMERA_RETRIES = 5
@@ -717,17 +1661,14 @@ def scanning_loop():
                     if lblVideo:
                         error_img = np.zeros((300, 400, 3), dtype=np.uint8)
                         cv2.putText(error_img, "ERROR DE CAMARA", (50, 150), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 0, 255), 2)
-                        img_rgb = cv2.cvtColor(error_img, cv2.COLOR_BGR2RGB)
-                        img_pil = Image.fromarray(img_rgb)
-                        img_tk = ImageTk.PhotoImage(image=img_pil)
-                        lblVideo.configure(image=img_tk)
-                        lblVideo.image = img_tk
+                        cv2.cvtColor(error_img, cv2.COLOR_BGR2RGB, dst=error_img)
+                        video_photo = paste_photo(lblVideo, video_photo, rgb_array_image(error_img))
                     # Continuar el bucle sin intentar capturar frames
                     pantalla.after(100, scanning_loop)
                 return
             
             # Intentar reconectar
-            cap = cv2.VideoCapture(CAMERA_INDEX)
+            cap = open_camera(CAMERA_INDEX)
             if cap.isOpened():
                 logger.info("Cámara reconectada exitosamente.")
                 camera_retries = 0  # Reiniciar contador de reintentos si tuvimos éxito
@@ -774,47 +1715,23 @@ def scanning_loop():
     # Preparar frame para mostrar (sin anotaciones de detección)
     display_frame = frame.copy()
     
+    # Convertir a RGB para Tkinter/PIL
+    display_frame = cv2.cvtColor(display_frame, cv2.COLOR_BGR2RGB)
+    
     # Usar las detecciones procesadas anteriormente en lugar de hacer re-inferencia
     if frame_processor.last_processed_frame is not None:
-        # Obtener todas las detecciones ya procesadas
-        all_detections = frame_processor.last_detections
-        
-        # Dibujar bounding boxes en el frame
-        if all_detections:
-            # Convertir a RGB para Tkinter/PIL
-            display_frame = cv2.cvtColor(display_frame, cv2.COLOR_BGR2RGB)
-            
-            # Dibujar cada detección
-            for detection in all_detections:
-                b_box = detection['box']
-                conf = detection['conf']
-                cls_name = detection['cls_name']
-                
-                x1, y1, x2, y2 = [max(0, coord) for coord in b_box]
-                
-                # Dibujar bounding box y texto
-                label_text = f'{cls_name} {conf:.2f}'
-                color = (0, 255, 0)  # Verde
-                cv2.rectangle(display_frame, (x1, y1), (x2, y2), color, 2)
-                (w, h), baseline = cv2.getTextSize(label_text, cv2.FONT_HERSHEY_SIMPLEX, 0.6, 2)
-                cv2.rectangle(display_frame, (x1, y1 - h - baseline - 5), (x1 + w, y1), (0,0,0), -1)
-                cv2.putText(display_frame, label_text, (x1, y1 - baseline - 2), 
-                          cv2.FONT_HERSHEY_SIMPLEX, 0.6, color, 2)
-        else:
-            # Convertir a RGB para Tkinter/PIL
-            display_frame = cv2.cvtColor(display_frame, cv2.COLOR_BGR2RGB)
-    else:
-        # Si no hay frame procesado aún, solo convertir a RGB
-        display_frame = cv2.cvtColor(display_frame, cv2.COLOR_BGR2RGB)
+        # Dibujar las detecciones ya procesadas
+        arrays = frame_processor.last_detections
+        if len(arrays['boxes']):
+            draw_detections(display_frame, arrays['boxes'], [CLASS_NAMES[i] for i in arrays['cls_idx'].tolist()],
+                            arrays['confs'].tolist())
     
     # Actualizar el frame en la GUI
     try:
-        frame_resized = imutils.resize(display_frame, width=FRAME_WIDTH)
-        img_pil = Image.fromarray(frame_resized)
-        img_tk = ImageTk.PhotoImage(image=img_pil)
+        preview_buffer = resize_to_width(display_frame, FRAME_WIDTH, dst=preview_buffer)
         if lblVideo:
-            lblVideo.configure(image=img_tk)
-            lblVideo.image = img_tk
+            # Copiar sobre el PhotoImage existente en lugar de crear uno por frame
+            video_photo = paste_photo(lblVideo, video_photo, rgb_array_image(preview_buffer))
     except Exception as e:
         logger.error(f"Error actualizando frame en GUI: {e}")
     
@@ -840,7 +1757,21 @@ class AppGUI:
         # Estado interno (anteriormente variables globales)
         self.motor_busy = False
         self.last_detected_class_index = -1
-        self.motor_thread = None
+        self.last_displayed_class_index = -1  # Clase cuyas imágenes de ejemplo se muestran
+        self._resized_buffer = None  # Buffer reutilizado por update_camera_frame
+        self._last_label_state = {}  # Última configuración escrita en cada Label (ver _set_label)
+        self._last_label_value = {}  # Último valor mostrado en cada Label de texto formateado
+        self._count_text_formats = {name: name + ": {}" for name in CLASS_NAMES}
+        # Un único hilo persistente para las secuencias del motor (solo puede haber una a la vez)
+        self._motor_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='motor')
+        self.motor_future = None
+        self.frame_processor = None
+        # Parámetros ajustables en marcha desde el panel de configuración
+        self.live = SimpleNamespace(drop_delay=DROP_DELAY, min_confidence=MIN_CONFIDENCE)
+        # Limitador de logs de los sliders, por slider: último log (time.monotonic)
+        # y log final pendiente (id de after) con el último valor del arrastre
+        self._slider_log_times = {}
+        self._slider_log_pending = {}
         self.processing_stats = {
             'frame_count': 0,
             'last_fps_time': time.time(),
@@ -859,6 +1790,13 @@ class AppGUI:
         self.class_count_labels = {}
         self.bin_level_labels = {}
         
+        # Pipeline de video (ver scanning_loop)
+        self.capture_thread = None
+        self.draw_thread = None
+        self._frame_lock = threading.Lock()
+        self._pending_frame = None  # (Image, on_done) pendiente de mostrar
+        self._video_photo = None    # PhotoImage reutilizado para el video
+        
         # Rutas a recursos gráficos desde config
         self.ui_assets_path = config.get('ui_assets.base_path', "ui_assets/")
         self.background_img_path = config.get('ui_assets.background', self.ui_assets_path + "Canva.png")
@@ -906,6 +1844,9 @@ class AppGUI:
         # Crear Labels para Video y Ejemplos
         self.lblVideo = Label(self.parent)
         self.lblVideo.place(x=320, y=180)  # Ajustar posición según tu fondo
+        # PhotoImage del video creado una sola vez con el tamaño de la vista previa;
+        # cada frame se copia sobre él (paste_photo)
+        self._video_photo = paste_photo(self.lblVideo, None, Image.new('RGB', (FRAME_WIDTH, FRAME_HEIGHT)))
         
         self.lblImgExample = Label(self.parent)  # Label para imagen de ejemplo
         self.lblImgExample.place(x=75, y=260)  # Ajustar posición
@@ -918,11 +1859,11 @@ class AppGUI:
         self.create_status_panel()
     
     def _load_ui_assets(self):
-        """Carga las imágenes de ejemplo desde las rutas especificadas."""
+        """Carga las imágenes de ejemplo desde las rutas especificadas (ya como PhotoImage)."""
         logger.info("INFO: Cargando imágenes de ejemplo para la GUI...")
         for name, path in self.example_img_paths.items():
             try:
-                img = cv2.imread(path)
+                img = load_photo_image(path)
                 if img is not None:
                     self.example_images[name] = img
                 else:
@@ -932,7 +1873,7 @@ class AppGUI:
         
         for name, path in self.example_txt_paths.items():
             try:
-                img = cv2.imread(path)
+                img = load_photo_image(path)
                 if img is not None:
                     self.example_texts[name] = img
                 else:
@@ -943,90 +1884,80 @@ class AppGUI:
     
     def display_example_images(self, class_name):
         """Muestra la imagen y texto de ejemplo para la clase dada."""
-        img_to_show = self.example_images.get(class_name)
-        txt_to_show = self.example_texts.get(class_name)
-        
-        # Mostrar imagen de ejemplo
-        if img_to_show is not None and self.lblImgExample:
-            try:
-                img_rgb = cv2.cvtColor(img_to_show, cv2.COLOR_BGR2RGB)
-                img_pil = Image.fromarray(img_rgb)
-                img_tk = ImageTk.PhotoImage(image=img_pil)
-                self.lblImgExample.configure(image=img_tk)
-                self.lblImgExample.image = img_tk  # Guardar referencia
-            except Exception as e:
-                logger.error(f"ERROR: Mostrando imagen de ejemplo para {class_name}: {e}")
-        elif self.lblImgExample:
-            self.lblImgExample.configure(image='')  # Limpiar si no hay imagen
-        
-        # Mostrar texto de ejemplo
-        if txt_to_show is not None and self.lblTxtExample:
-            try:
-                txt_rgb = cv2.cvtColor(txt_to_show, cv2.COLOR_BGR2RGB)
-                txt_pil = Image.fromarray(txt_rgb)
-                txt_tk = ImageTk.PhotoImage(image=txt_pil)
-                self.lblTxtExample.configure(image=txt_tk)
-                self.lblTxtExample.image = txt_tk  # Guardar referencia
-            except Exception as e:
-                logger.error(f"ERROR: Mostrando texto de ejemplo para {class_name}: {e}")
-        elif self.lblTxtExample:
-            self.lblTxtExample.configure(image='')  # Limpiar si no hay texto
+        # PhotoImages precargados (las referencias viven en example_images/example_texts);
+        # '' limpia el Label si la clase no tiene imagen
+        if self.lblImgExample:
+            self.lblImgExample.configure(image=self.example_images.get(class_name, ''))
+        if self.lblTxtExample:
+            self.lblTxtExample.configure(image=self.example_texts.get(class_name, ''))
     
     def clear_example_images(self):
         """Limpia las etiquetas de imágenes de ejemplo en la GUI."""
         if self.lblImgExample:
             self.lblImgExample.configure(image='')
-            self.lblImgExample.image = None
         if self.lblTxtExample:
             self.lblTxtExample.configure(image='')
-            self.lblTxtExample.image = None
     
     def update_status_indicators(self, sensor_monitoring_active=False):
         """Actualiza los indicadores de estado en la interfaz de usuario."""
         # Actualizar indicador de estado del motor
         if self.lblMotorStatus:
             if self.motor_busy:
-                self.lblMotorStatus.config(text="MOTOR: OCUPADO", fg="red", bg="#ffcccc")
+                self._set_label(self.lblMotorStatus, text="MOTOR: OCUPADO", fg="red", bg="#ffcccc")
             else:
-                self.lblMotorStatus.config(text="MOTOR: LISTO", fg="green", bg="#ccffcc")
+                self._set_label(self.lblMotorStatus, text="MOTOR: LISTO", fg="green", bg="#ccffcc")
         
         # Actualizar contador de FPS
         if self.lblFPS:
-            self.lblFPS.config(text=f"FPS: {self.processing_stats['fps']:.1f}")
+            self._set_label_value(self.lblFPS, self.processing_stats['fps'], "FPS: {:.1f}")
         
         # Actualizar contador total
         if self.lblTotalCount:
-            self.lblTotalCount.config(text=f"Total Clasificados: {self.processing_stats['total_detections']}")
+            self._set_label_value(self.lblTotalCount, self.processing_stats['total_detections'], "Total Clasificados: {}")
         
         # Actualizar contadores por clase
         for class_name, label in self.class_count_labels.items():
             count = self.processing_stats['detection_counts'].get(class_name, 0)
-            label.config(text=f"{class_name}: {count}")
+            text_format = self._count_text_formats.get(class_name) or class_name + ": {}"
+            self._set_label_value(label, count, text_format)
         
-        # Actualizar indicadores de nivel de llenado (si existen)
+        # Actualizar indicadores de nivel de llenado con la última medición (sin E/S)
         if self.bin_level_labels and sensor_monitoring_active:
             try:
-                # Obtener los niveles actuales (lectura única)
-                bin_levels = sensor_controller.get_fill_levels(use_average=True, num_readings=1)
-                
-                # Actualizar cada etiqueta de nivel
-                for bin_name, level in bin_levels.items():
-                    if level is not None:
-                        # Determinar color según nivel de llenado
-                        if level > 80:
-                            color = "#ff4444"  # Rojo (casi lleno)
-                        elif level > 50:
-                            color = "#ffaa44"  # Naranja (medio)
-                        else:
-                            color = "#44aa44"  # Verde (vacío)
-                        
-                        label = self.bin_level_labels[bin_name]
-                        label.config(text=f"Nivel: {level:.1f}%", fg=color)
-                    else:
-                        label.config(text="Nivel: Error", fg="gray")
+                self.update_fill_indicators(sensor_controller.last_levels)
             except Exception as e:
                 logger.error(f"Error al actualizar niveles de llenado: {e}")
     
+    def _set_label(self, label, **options):
+        """Configura label solo si options difiere de lo último que se escribió en él."""
+        if self._last_label_state.get(label) == options:
+            return
+        label.config(**options)
+        self._last_label_state[label] = options
+    
+    def _set_label_value(self, label, value, text_format, **options):
+        """
+        Como _set_label, pero el texto (text_format.format(value)) solo se
+        construye si value cambió desde la última vez.
+        """
+        if label in self._last_label_value and self._last_label_value[label] == value:
+            return
+        self._last_label_value[label] = value
+        self._set_label(label, text=text_format.format(value), **options)
+    
+    def start_gui_tick(self):
+        """
+        Refresca los indicadores de estado a frecuencia fija (GUI_REFRESH_MS).
+        Los hilos de trabajo solo modifican processing_stats y sensor_controller.last_levels;
+        todo el redibujado de etiquetas ocurre aquí, en el hilo de Tkinter.
+        """
+        self._gui_tick()
+    
+    def _gui_tick(self):
+        self.update_status_indicators(sensor_monitoring_active)
+        if self.parent:
+            self.parent.after(GUI_REFRESH_MS, self._gui_tick)
+    
     def create_status_panel(self):
         """Crea un panel de estado para mostrar información en tiempo real."""
         # Panel principal para estadísticas
@@ -1106,8 +2037,6 @@ class AppGUI:
     
     def create_config_panel(self):
         """Crea un panel de configuración para ajustar parámetros en tiempo real."""
-        global DROP_DELAY, MIN_CONFIDENCE  # Usar variables globales hasta refactor completo
-        
         config_frame = Frame(self.parent, bg='#f0f0f0', padx=10, pady=10)
         config_frame.place(x=10, y=10, width=300, height=150)
         
@@ -1115,7 +2044,7 @@ class AppGUI:
         drop_delay_label = Label(config_frame, text="Tiempo de Caída (s):", bg='#f0f0f0')
         drop_delay_label.grid(row=0, column=0, sticky='w', pady=5)
         
-        drop_delay_var = tk.DoubleVar(value=DROP_DELAY)
+        drop_delay_var = tk.DoubleVar(value=self.live.drop_delay)
         drop_delay_scale = Scale(
             config_frame, 
             from_=0.5, 
@@ -1131,7 +2060,7 @@ class AppGUI:
         conf_label = Label(config_frame, text="Umbral de Confianza:", bg='#f0f0f0')
         conf_label.grid(row=1, column=0, sticky='w', pady=5)
         
-        conf_var = tk.DoubleVar(value=MIN_CONFIDENCE)
+        conf_var = tk.DoubleVar(value=self.live.min_confidence)
         conf_scale = Scale(
             config_frame, 
             from_=0.1, 
@@ -1149,30 +2078,71 @@ class AppGUI:
             text="Guardar Configuración",
             command=self.save_current_config
         )
-        save_button.grid(row=2, column=0, columnspan=2, pady=10)
+        save_button.grid(row=2, column=0, pady=10)
+        
+        # Botón para reintentar la cámara después de darla por perdida
+        reconnect_button = Button(
+            config_frame,
+            text="Reconectar Cámara",
+            command=self.reconnect_camera
+        )
+        reconnect_button.grid(row=2, column=1, pady=10)
         
         return config_frame
     
+    def _log_slider(self, slider, message):
+        """
+        Registra el cambio de un slider como mucho una vez por SLIDER_LOG_INTERVAL.
+        Los cambios omitidos dejan programado un log con el último valor, de modo
+        que al soltar el slider siempre queda registrado el valor aplicado.
+        """
+        pending = self._slider_log_pending.pop(slider, None)
+        if pending is not None and self.parent:
+            self.parent.after_cancel(pending)
+        
+        now = time.monotonic()
+        if now - self._slider_log_times.get(slider, 0.0) >= SLIDER_LOG_INTERVAL:
+            self._slider_log_times[slider] = now
+            logger.info(message)
+        elif self.parent:
+            self._slider_log_pending[slider] = self.parent.after(
+                int(SLIDER_LOG_INTERVAL * 1000), self._flush_slider_log, slider, message)
+    
+    def _flush_slider_log(self, slider, message):
+        """Registra el último valor de un slider cuyo log quedó pendiente."""
+        self._slider_log_pending.pop(slider, None)
+        self._slider_log_times[slider] = time.monotonic()
+        logger.info(message)
+    
     def update_drop_delay(self, new_value):
         """Actualiza el tiempo de caída en tiempo real."""
-        global DROP_DELAY
-        DROP_DELAY = float(new_value)
-        logger.info(f"Tiempo de caída actualizado a {DROP_DELAY} segundos")
+        self.live.drop_delay = float(new_value)
+        self._log_slider('drop_delay', f"Tiempo de caída actualizado a {self.live.drop_delay} segundos")
     
     def update_confidence(self, new_value):
-        """Actualiza el umbral de confianza en tiempo real."""
-        global MIN_CONFIDENCE
-        MIN_CONFIDENCE = float(new_value)
-        logger.info(f"Umbral de confianza actualizado a {MIN_CONFIDENCE}")
+        """Actualiza el umbral de confianza en tiempo real (se aplica desde el siguiente lote)."""
+        self.live.min_confidence = float(new_value)
+        if self.frame_processor:
+            self.frame_processor.min_confidence = self.live.min_confidence
+        self._log_slider('min_confidence', f"Umbral de confianza actualizado a {self.live.min_confidence}")
     
     def save_current_config(self):
         """Guarda la configuración actual al archivo."""
-        global config, DROP_DELAY, MIN_CONFIDENCE
-        config.set('drop_delay', DROP_DELAY)
-        config.set('min_confidence', MIN_CONFIDENCE)
-        config.save()
+        self.config.set('drop_delay', self.live.drop_delay)
+        self.config.set('min_confidence', self.live.min_confidence)
+        self.config.save()
         logger.info("Configuración guardada correctamente")
     
+    def set_bin_levels(self, levels):
+        """
+        Callback del hilo de monitoreo de sensores: envía la última medición al
+        adaptador web (la GUI la lee de sensor_controller.last_levels en su próximo refresco).
+        
+        Args:
+            levels (dict): Diccionario con los niveles de llenado por compartimento
+        """
+        main_web_adapter.update_data(fill_levels=levels)
+    
     def update_fill_indicators(self, levels):
         """
         Actualiza los indicadores visuales de nivel de llenado en la GUI.
@@ -1194,23 +2164,16 @@ class AppGUI:
                     else:
                         color = "#44aa44"  # Verde (vacío)
                     
-                    label.config(text=f"Nivel: {level:.1f}%", fg=color)
+                    self._set_label_value(label, level, "Nivel: {:.1f}%", fg=color)
                 else:
-                    label.config(text="Nivel: Error", fg="gray")
-        
-        # Nuevo: Actualizar adaptador web con niveles de llenado
-        main_web_adapter.update_data(fill_levels=levels)
+                    self._set_label_value(label, None, "Nivel: Error", fg="gray")
     
     def update_camera_frame(self, frame):
         """Actualiza el frame de la cámara en la GUI."""
         if self.lblVideo:
             try:
-                frame_width = self.config.get('frame_width')
-                frame_resized = imutils.resize(frame, width=frame_width)
-                img_pil = Image.fromarray(frame_resized)
-                img_tk = ImageTk.PhotoImage(image=img_pil)
-                self.lblVideo.configure(image=img_tk)
-                self.lblVideo.image = img_tk
+                self._resized_buffer = resize_to_width(frame, FRAME_WIDTH, dst=self._resized_buffer)
+                self._video_photo = paste_photo(self.lblVideo, self._video_photo, rgb_array_image(self._resized_buffer))
             except Exception as e:
                 logger.error(f"Error actualizando frame en GUI: {e}")
     
@@ -1220,11 +2183,8 @@ class AppGUI:
             try:
                 error_img = np.zeros((300, 400, 3), dtype=np.uint8)
                 cv2.putText(error_img, message, (50, 150), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 0, 255), 2)
-                img_rgb = cv2.cvtColor(error_img, cv2.COLOR_BGR2RGB)
-                img_pil = Image.fromarray(img_rgb)
-                img_tk = ImageTk.PhotoImage(image=img_pil)
-                self.lblVideo.configure(image=img_tk)
-                self.lblVideo.image = img_tk
+                cv2.cvtColor(error_img, cv2.COLOR_BGR2RGB, dst=error_img)
+                self._video_photo = paste_photo(self.lblVideo, self._video_photo, rgb_array_image(error_img))
             except Exception as e:
                 logger.error(f"Error mostrando frame de error: {e}")
 
@@ -1233,36 +2193,35 @@ class AppGUI:
         Callback que se llama cuando el procesador de frames tiene una detección.
         
         Args:
-            best_detection: La mejor detección (mayor confianza)
+            best_detection: La mejor Detection (mayor confianza) o None
             all_detections: Lista de todas las detecciones válidas
         """
         if best_detection:
             # Tenemos una detección
-            cls_index = best_detection['cls_index']
-            cls_name = best_detection['cls_name']
+            cls_index = best_detection.cls_index
+            cls_name = best_detection.cls_name
             
-            # Mostrar la imagen de ejemplo asociada
-            self.display_example_images(cls_name)
+            # Mostrar la imagen de ejemplo asociada (solo si cambia la clase)
+            if cls_index != self.last_displayed_class_index:
+                self.display_example_images(cls_name)
+                self.last_displayed_class_index = cls_index
             
-            # Si el motor no está ocupado y es una nueva clase, activar motor
-            if not self.motor_busy and cls_index in TARGET_STEPS_MAP and cls_index != self.last_detected_class_index:
+            # Si el motor no está ocupado y es una nueva clase con posición asignada, activar motor
+            # (comprobaciones baratas primero; una sola búsqueda en el mapa)
+            target_position = None
+            if not self.motor_busy and cls_index != self.last_detected_class_index:
+                target_position = TARGET_STEPS_MAP.get(cls_index)
+            if target_position is not None:
                 self.motor_busy = True
-                self.update_status_indicators(sensor_monitoring_active)
-                target_position = TARGET_STEPS_MAP[cls_index]
                 logger.info(f"Detección válida: '{cls_name}'. Iniciando motor hacia {target_position} pasos.")
                 
                 # Actualizar contadores
                 self.processing_stats['detection_counts'][cls_name] = self.processing_stats['detection_counts'].get(cls_name, 0) + 1
                 self.processing_stats['total_detections'] += 1
-                self.update_status_indicators(sensor_monitoring_active)
                 
-                # Iniciar hilo del motor
-                self.motor_thread = threading.Thread(
-                    target=self.handle_motor_sequence,
-                    args=(target_position, cls_name),
-                    daemon=True
-                )
-                self.motor_thread.start()
+                # Ejecutar la secuencia en el hilo del motor
+                self.motor_future = self._motor_executor.submit(
+                    self.handle_motor_sequence, target_position, cls_name)
                 
                 # Actualizar última clase
                 self.last_detected_class_index = cls_index
@@ -1270,7 +2229,7 @@ class AppGUI:
                 # Actualizar adaptador web
                 detection_data = {
                     'class_name': cls_name,
-                    'confidence': best_detection['conf']
+                    'confidence': best_detection.conf
                 }
                 # Actualizar adaptador web
                 main_web_adapter.update_data(detection=detection_data)
@@ -1278,6 +2237,7 @@ class AppGUI:
             # No hay detección, limpiar si no hay motor activo
             if not self.motor_busy and self.last_detected_class_index != -1:
                 self.last_detected_class_index = -1
+                self.last_displayed_class_index = -1
                 self.clear_example_images()
 
     def handle_motor_sequence(self, target_position, class_name):
@@ -1301,8 +2261,9 @@ class AppGUI:
             logger.info(f"THREAD: Motor en posición {target_position}.")
 
             # 2. Esperar a que el objeto caiga
-            logger.info(f"THREAD: Esperando {DROP_DELAY:.1f} segundos para que caiga el objeto...")
-            time.sleep(DROP_DELAY)  # time.sleep() es seguro aquí (hilo separado)
+            drop_delay = self.live.drop_delay
+            logger.info(f"THREAD: Esperando {drop_delay:.1f} segundos para que caiga el objeto...")
+            time.sleep(drop_delay)  # time.sleep() es seguro aquí (hilo separado)
 
             # 3. Volver a la posición HOME (si es diferente)
             if target_position != HOME_POSITION_STEPS:
@@ -1344,12 +2305,13 @@ class AppGUI:
             # 4. ¡MUY IMPORTANTE! Liberar el flag para permitir nuevas detecciones.
             logger.info("THREAD: Liberando bandera 'motor_busy'.")
             self.motor_busy = False
-            # Usar after para actualizar la UI desde el hilo principal
-            if self.parent:
-                self.parent.after(10, lambda: self.update_status_indicators(sensor_monitoring_active))
                 
     def update_frame_stats(self):
-        """Actualiza las estadísticas de procesamiento de frames (FPS)."""
+        """
+        Cuenta un frame procesado y actualiza los FPS una vez por segundo.
+        La llama DrawThread por cada frame que sale de la inferencia, se
+        muestre o no (ver DrawThread.run).
+        """
         self.processing_stats['frame_count'] += 1
         current_time = time.time()
         time_diff = current_time - self.processing_stats['last_fps_time']
@@ -1359,128 +2321,83 @@ class AppGUI:
             self.processing_stats['fps'] = self.processing_stats['frame_count'] / time_diff
             self.processing_stats['last_fps_time'] = current_time
             self.processing_stats['frame_count'] = 0
-            self.update_status_indicators(sensor_monitoring_active)
+    
+    def show_frame(self, img_pil, on_done=None):
+        """
+        Muestra una imagen PIL en el Label de video. Se puede llamar desde
+        cualquier hilo: si hay un intercambio pendiente solo se sustituye la
+        imagen, de modo que Tkinter nunca acumula más de una llamada.
+        on_done se llama cuando la imagen ya no se necesita (mostrada o sustituida).
+        """
+        with self._frame_lock:
+            replaced = self._pending_frame
+            self._pending_frame = (img_pil, on_done)
+        if replaced is None:
+            if self.parent:
+                self.parent.after(0, self._blit)
+        elif replaced[1]:
+            replaced[1]()
+    
+    def _blit(self):
+        """Copia la imagen pendiente en el PhotoImage del video (hilo de Tkinter)."""
+        with self._frame_lock:
+            pending, self._pending_frame = self._pending_frame, None
+        if pending is None:
+            return
+        img_pil, on_done = pending
+        try:
+            if self.lblVideo:
+                # Reutilizar el mismo PhotoImage mientras no cambie el tamaño
+                self._video_photo = paste_photo(self.lblVideo, self._video_photo, img_pil)
+        except Exception as e:
+            logger.error(f"Error actualizando frame en GUI: {e}")
+        finally:
+            if on_done:
+                on_done()
     
     def scanning_loop(self, cap, frame_processor, model):
         """
-        Bucle principal para capturar y procesar frames de la cámara.
+        Arranca la captura y el dibujo de frames en hilos propios. Junto con el
+        hilo de inferencia del FrameProcessor forman un pipeline conectado por
+        colas acotadas: captura -> inferencia -> dibujo.
         
         Args:
             cap: Objeto de captura de OpenCV
-            frame_processor: Procesador de frames
+            frame_processor: Procesador de frames (ya iniciado)
             model: Modelo YOLO 
         """
-        # Variables de seguimiento para reintentos de cámara
-        MAX_CAMERA_RETRIES = 5
-        camera_retries = 0
-        
-        # Actualizar estadísticas de frames
-        self.update_frame_stats()
-        
-        if cap is None or not cap.isOpened():
-            logger.error("Cámara no disponible o cerrada. Intentando reconectar...")
-            try:
-                if cap is not None:
-                    cap.release()  # Liberar recursos antes de intentar reconectar
-                
-                # Verificar si excedimos el número máximo de reintentos
-                if camera_retries >= MAX_CAMERA_RETRIES:
-                    logger.critical(f"Se alcanzó el máximo de {MAX_CAMERA_RETRIES} reintentos de reconexión de cámara. Deteniendo escaneo.")
-                    if self.parent:
-                        # Mostrar mensaje de error en la GUI
-                        self.show_error_frame("ERROR DE CAMARA")
-                        # Continuar el bucle sin intentar capturar frames
-                        self.parent.after(100, lambda: self.scanning_loop(cap, frame_processor, model))
-                    return
-                
-                # Intentar reconectar
-                cap = cv2.VideoCapture(CAMERA_INDEX)
-                if cap.isOpened():
-                    logger.info("Cámara reconectada exitosamente.")
-                    camera_retries = 0  # Reiniciar contador de reintentos si tuvimos éxito
-                else:
-                    camera_retries += 1
-                    logger.warning(f"Reintento {camera_retries}/{MAX_CAMERA_RETRIES} fallido. Esperando antes de volver a intentar...")
-                    time.sleep(1.0)  # Esperar antes de reintentar
-                    if self.parent:
-                        self.parent.after(100, lambda: self.scanning_loop(cap, frame_processor, model))
-                    return
-            except Exception as e:
-                camera_retries += 1
-                logger.error(f"Error al reconectar cámara: {e}. Reintento {camera_retries}/{MAX_CAMERA_RETRIES}")
-                time.sleep(1.0)
-                if self.parent:
-                    self.parent.after(100, lambda: self.scanning_loop(cap, frame_processor, model))
-                return
-        
-        # Capturar frame de la cámara
-        ret, frame = cap.read()
-        if not ret:
-            logger.error("No se pudo capturar frame de la cámara.")
-            camera_retries += 1
-            if camera_retries >= MAX_CAMERA_RETRIES:
-                logger.critical(f"Se alcanzó el máximo de {MAX_CAMERA_RETRIES} reintentos de captura de frame. Reconectando cámara...")
-                # Resetear la cámara
-                try:
-                    if cap is not None:
-                        cap.release()
-                    cap = None  # Forzar reconexión en la próxima iteración
-                except Exception as e:
-                    logger.error(f"Error al liberar cámara para reconexión: {e}")
-            
-            time.sleep(0.5)
-            if self.parent:
-                self.parent.after(50, lambda: self.scanning_loop(cap, frame_processor, model))
-            return
-        
-        # Resetear contador de reintentos si llegamos aquí (captura exitosa)
-        camera_retries = 0
-        
-        # Añadir frame al buffer para procesamiento en segundo plano
-        frame_processor.add_frame(frame)
-        
-        # Preparar frame para mostrar (sin anotaciones de detección)
-        display_frame = frame.copy()
-        
-        # Usar las detecciones procesadas anteriormente en lugar de hacer re-inferencia
-        if frame_processor.last_processed_frame is not None:
-            # Obtener todas las detecciones ya procesadas
-            all_detections = frame_processor.last_detections
-            
-            # Dibujar bounding boxes en el frame
-            if all_detections:
-                # Convertir a RGB para Tkinter/PIL
-                display_frame = cv2.cvtColor(display_frame, cv2.COLOR_BGR2RGB)
-                
-                # Dibujar cada detección
-                for detection in all_detections:
-                    b_box = detection['box']
-                    conf = detection['conf']
-                    cls_name = detection['cls_name']
-                    
-                    x1, y1, x2, y2 = [max(0, coord) for coord in b_box]
-                    
-                    # Dibujar bounding box y texto
-                    label_text = f'{cls_name} {conf:.2f}'
-                    color = (0, 255, 0)  # Verde
-                    cv2.rectangle(display_frame, (x1, y1), (x2, y2), color, 2)
-                    (w, h), baseline = cv2.getTextSize(label_text, cv2.FONT_HERSHEY_SIMPLEX, 0.6, 2)
-                    cv2.rectangle(display_frame, (x1, y1 - h - baseline - 5), (x1 + w, y1), (0,0,0), -1)
-                    cv2.putText(display_frame, label_text, (x1, y1 - baseline - 2), 
-                              cv2.FONT_HERSHEY_SIMPLEX, 0.6, color, 2)
-            else:
-                # Convertir a RGB para Tkinter/PIL
-                display_frame = cv2.cvtColor(display_frame, cv2.COLOR_BGR2RGB)
-        else:
-            # Si no hay frame procesado aún, solo convertir a RGB
-            display_frame = cv2.cvtColor(display_frame, cv2.COLOR_BGR2RGB)
-        
-        # Actualizar el frame en la GUI
-        self.update_camera_frame(display_frame)
-        
-        # Programar la siguiente iteración
+        self.frame_processor = frame_processor
+        self.capture_thread = CaptureThread(cap, frame_processor, on_error=self._on_camera_error)
+        self.draw_thread = DrawThread(frame_processor, self)
+        self.capture_thread.start()
+        self.draw_thread.start()
+    
+    def _on_camera_error(self):
+        """Llamado desde el hilo de captura cuando la cámara se da por perdida."""
         if self.parent:
-            self.parent.after(20, lambda: self.scanning_loop(cap, frame_processor, model))
+            self.parent.after(0, lambda: self.show_error_frame("ERROR DE CAMARA"))
+    
+    def reconnect_camera(self):
+        """Vuelve a intentar abrir la cámara si el hilo de captura la dio por perdida."""
+        if self.frame_processor is None:
+            return
+        if self.capture_thread and self.capture_thread.is_alive():
+            logger.info(f"La cámara no está perdida (estado: {self.capture_thread.state}); no se reconecta")
+            return
+        logger.info("Reconectando la cámara a petición del usuario...")
+        self.capture_thread = CaptureThread(None, self.frame_processor, on_error=self._on_camera_error)
+        self.capture_thread.start()
+    
+    def stop_scanning(self):
+        """Detiene los hilos de captura y dibujo (la cámara se libera al detener la captura)."""
+        if self.capture_thread:
+            self.capture_thread.stop()
+        if self.draw_thread:
+            self.draw_thread.stop()
+    
+    def stop_motor_worker(self):
+        """Cierra el hilo del motor sin esperar a que termine la secuencia en curso."""
+        self._motor_executor.shutdown(wait=False)
 
 # --- Función Principal de la Aplicación ---
 
@@ -1526,32 +2443,33 @@ def main_app():
         gui = AppGUI(pantalla, config)
         logger.info("INFO: GUI creada.")
 
-        # --- 3. Cargar Modelo YOLO ---
-        logger.info(f"INFO: Cargando modelo YOLO desde '{MODEL_PATH}'...")
-        try:
-            model = YOLO(MODEL_PATH)
-            # Opcional: hacer una inferencia dummy para calentar/verificar
-            # model(np.zeros((480, 640, 3)), verbose=False)
-            logger.info("INFO: Modelo YOLO cargado exitosamente.")
-        except Exception as e:
-            raise RuntimeError(f"Error CRÍTICO al cargar el modelo YOLO desde '{MODEL_PATH}': {e}")
-
-        # --- 5. Inicializar Cámara ---
+        # --- 3. Inicializar Cámara ---
+        # (antes que el modelo: sus frames calibran la cuantización INT8)
         logger.info(f"INFO: Inicializando cámara (índice {CAMERA_INDEX})...")
-        cap = cv2.VideoCapture(CAMERA_INDEX)
+        cap = open_camera(CAMERA_INDEX)
         if not cap.isOpened():
             raise IOError(f"Error CRÍTICO: No se puede abrir la cámara con índice {CAMERA_INDEX}. Verifica conexión y permisos.")
         logger.info("INFO: Cámara inicializada.")
 
+        # --- 4. Cargar Modelo YOLO ---
+        logger.info(f"INFO: Cargando modelo YOLO desde '{MODEL_PATH}' (formato {MODEL_FORMAT})...")
+        try:
+            model = load_model(MODEL_PATH, MODEL_FORMAT, INFERENCE_IMGSZ, quantize=QUANTIZE_MODEL, cap=cap,
+                               batch=INFERENCE_BATCH)
+            # Inferencias de calentamiento antes del primer frame real
+            warmup_model(model, INFERENCE_IMGSZ, batch=INFERENCE_BATCH)
+            logger.info("INFO: Modelo YOLO cargado exitosamente.")
+        except Exception as e:
+            raise RuntimeError(f"Error CRÍTICO al cargar el modelo YOLO desde '{MODEL_PATH}': {e}")
+
         # --- 6. Actualizar funciones para usar la GUI encapsulada ---
         # Actualizar el callback de detección para usar la instancia gui
         def adapted_detection_callback(best_detection, all_detections=None):
             gui.handle_detection(best_detection, all_detections)
-            gui.update_status_indicators(sensor_monitoring_active)
         
         # Iniciar el procesador de frames con el callback adaptado
         logger.info("INFO: Iniciando procesador de frames...")
-        frame_processor.start_processing(model, MIN_CONFIDENCE, adapted_detection_callback)
+        frame_processor.start_processing(model, gui.live.min_confidence, adapted_detection_callback)
         
         logger.info("INFO: Iniciando bucle principal de escaneo y detección...")
         gui.scanning_loop(cap, frame_processor, model)
@@ -1560,16 +2478,20 @@ def main_app():
         if sensors_setup_successful:
             logger.info("INFO: Iniciando monitoreo de niveles de llenado...")
             sensor_monitoring_active = sensor_controller.start_continuous_monitoring(
-                callback=gui.update_fill_indicators,
-                interval=10.0  # Actualizar cada 10 segundos
+                callback=gui.set_bin_levels,
+                interval=SENSOR_POLL_INTERVAL
             )
             if sensor_monitoring_active:
                 logger.info("INFO: Monitoreo de niveles iniciado correctamente.")
             else:
                 logger.warning("ADVERTENCIA: No se pudo iniciar el monitoreo de niveles.")
 
+        # Refresco periódico de los indicadores de estado
+        gui.start_gui_tick()
+        
         # --- 8. Iniciar Bucle Principal de Tkinter ---
         # Esto mantiene la ventana abierta y procesa eventos
+        pin_current_thread('gui')
         pantalla.mainloop()
 
         # Nuevo: Actualizar estado de cierre
@@ -1585,6 +2507,16 @@ def main_app():
         # Limpiar recursos y cerrar conexiones
         logger.info("INFO: Realizando limpieza de recursos...")
         
+        try:
+            # Detener la captura y el dibujo de frames
+            if gui:
+                gui.stop_scanning()
+        except Exception as scan_e:
+            logger.error(f"ERROR: Durante la detención de la captura de video: {scan_e}")
+        
+        if gui:
+            gui.stop_motor_worker()
+        
         try:
             # Detener el procesamiento de video si está activo
             if frame_processor and frame_processor.is_running:
@@ -15,6 +15,7 @@ Uso:
 """
 
 import socket
+import struct
 import threading
 import json
 import logging
@@ -36,6 +37,9 @@ HOST = '127.0.0.1'
 PORT = 5001
 MAX_CONNECTIONS = 5
 SOCKET_TIMEOUT = 5.0  # segundos
+CLIENT_IDLE_TIMEOUT = 60.0  # segundos sin comandos antes de cerrar una conexión persistente
+# Cada respuesta va precedida de su longitud (4 bytes, big-endian)
+LENGTH_PREFIX = struct.Struct('>I')
 
 # Datos del sistema (serán actualizados por main.py)
 system_data = {
@@ -81,32 +85,52 @@ def update_data(fill_levels=None, detection=None, system_status=None):
     
     logger.debug("Datos actualizados para el backend")
 
+def send_message(client_socket, payload):
+    """
+    Envía un mensaje con prefijo de longitud para que el cliente sepa
+    exactamente cuántos bytes leer.
+    
+    Args:
+        client_socket: Socket de conexión con el cliente
+        payload (bytes): Contenido a enviar
+    """
+    client_socket.sendall(LENGTH_PREFIX.pack(len(payload)) + payload)
+
 def handle_client(client_socket):
     """
     Maneja una conexión cliente.
+    La conexión es persistente: el cliente envía un comando por línea
+    (p. ej. b'GET_DATA\\n') y recibe una respuesta por cada uno.
     
     Args:
         client_socket: Socket de conexión con el cliente
     """
     try:
-        # Recibir comando del cliente
-        data = client_socket.recv(1024)
-        if not data:
-            return
-            
-        command = data.decode('utf-8')
+        # Desactivar Nagle: las respuestas son pequeñas y se envían de una vez
+        client_socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        client_socket.settimeout(CLIENT_IDLE_TIMEOUT)
         
-        # Procesar comando
-        if command == 'GET_DATA':
-            # Enviar datos actuales
-            response = json.dumps(system_data)
-            client_socket.sendall(response.encode('utf-8'))
-            logger.debug("Datos enviados al cliente")
-        else:
-            # Comando desconocido
-            response = json.dumps({'error': 'Comando desconocido'})
-            client_socket.sendall(response.encode('utf-8'))
-            logger.warning(f"Comando desconocido recibido: {command}")
+        # Recibir comandos del cliente hasta que cierre la conexión
+        with client_socket.makefile('rb') as reader:
+            for line in reader:
+                command = line.strip().decode('utf-8')
+                if not command:
+                    continue
+                
+                # Procesar comando
+                if command == 'GET_DATA':
+                    # Enviar datos actuales
+                    response = json.dumps(system_data)
+                    send_message(client_socket, response.encode('utf-8'))
+                    logger.debug("Datos enviados al cliente")
+                else:
+                    # Comando desconocido
+                    response = json.dumps({'error': 'Comando desconocido'})
+                    send_message(client_socket, response.encode('utf-8'))
+                    logger.warning(f"Comando desconocido recibido: {command}")
+    
+    except socket.timeout:
+        logger.debug("Conexión de cliente inactiva cerrada")
     
     except Exception as e:
         logger.error(f"Error en manejo de cliente: {e}")
@@ -35,6 +35,9 @@ DEFAULT_READINGS_PER_MEASUREMENT = 3  # Número de lecturas a promediar
 DEFAULT_STABILIZATION_TIME = 0.5  # Tiempo de estabilización en segundos
 DEFAULT_MEASUREMENT_TIMEOUT = 0.5  # Tiempo máximo para una medición en segundos
 DEFAULT_READING_INTERVAL = 0.1  # Tiempo entre lecturas consecutivas
+DEFAULT_CYCLE_TIME = 0.06  # Tiempo mínimo entre disparos (evita mezclar ecos de ciclos distintos)
+DEFAULT_ECHO_TIMEOUT = 0.04  # El HC-SR04 baja ECHO a los ~38 ms si no recibe eco
+NEAR_OBJECT_DISTANCE_CM = 2.0  # Distancia devuelta si ECHO no baja a tiempo (objeto pegado al sensor)
 
 # --- Variables Globales ---
 sensor_pins = DEFAULT_SENSOR_PINS.copy()
@@ -46,6 +49,13 @@ monitoring_thread = None
 fill_level_cache = {}  # Caché de las últimas mediciones
 use_temperature_compensation = False
 current_temperature = 20.0  # Temperatura por defecto en grados Celsius
+last_levels = {}  # Última medición completa de todos los compartimentos (sin E/S al leerla)
+
+# Medición en paralelo: flancos de ECHO capturados por interrupción
+parallel_measurement = False  # True si los callbacks de ECHO están activos
+_echo_edges = {}  # echo_pin -> tiempos de los flancos del disparo en curso (None = ignorar)
+_echo_lock = threading.Lock()
+_echo_done = threading.Event()
 
 # --- Funciones de Configuración ---
 
@@ -174,6 +184,9 @@ def setup_sensors(force_mode=False):
                 logger.warning(f"Sensor '{name}' no responde en la prueba inicial")
             else:
                 logger.debug(f"Sensor '{name}' responde correctamente: {distance:.1f}cm")
+        
+        # A partir de aquí las mediciones se hacen con todos los sensores a la vez
+        enable_parallel_measurement()
                 
         return True
         
@@ -227,7 +240,7 @@ def get_distance_cm(trig_pin, echo_pin, timeout=DEFAULT_MEASUREMENT_TIMEOUT, ret
                 # Si el objeto está muy cerca, el pulso puede ser muy largo
                 if pulse_end_time - pulse_start_time > timeout:
                     logger.debug(f"Pulso ECHO muy largo en pin {echo_pin} (posible objeto muy cerca)")
-                    return 2.0  # Objeto muy cercano al sensor
+                    return NEAR_OBJECT_DISTANCE_CM  # Objeto muy cercano al sensor
                     
             # Calcular duración y distancia
             if pulse_start_time is not None and pulse_end_time is not None:
@@ -243,6 +256,114 @@ def get_distance_cm(trig_pin, echo_pin, timeout=DEFAULT_MEASUREMENT_TIMEOUT, ret
         
     return None  # Fallaron todos los intentos
 
+def _echo_callback(channel):
+    """Callback de interrupción de ECHO: guarda el instante del flanco (subida y bajada)."""
+    now = time.perf_counter()
+    with _echo_lock:
+        edges = _echo_edges.get(channel)
+        if edges is None or len(edges) >= 2:
+            return
+        edges.append(now)
+        if all(len(pin_edges) >= 2 for pin_edges in _echo_edges.values() if pin_edges is not None):
+            _echo_done.set()
+
+def enable_parallel_measurement():
+    """
+    Registra callbacks de flanco en los pines ECHO para medir todos los sensores
+    con un solo disparo. Si no es posible se sigue midiendo sensor a sensor.
+    
+    Returns:
+        bool: True si la medición en paralelo quedó activa.
+    """
+    global parallel_measurement
+    
+    try:
+        for name, (trig_pin, echo_pin) in sensor_pins.items():
+            GPIO.add_event_detect(echo_pin, GPIO.BOTH, callback=_echo_callback)
+        parallel_measurement = True
+        logger.info("Medición en paralelo de los sensores activada")
+    except Exception as e:
+        logger.warning(f"No se pudo activar la medición en paralelo, se medirá sensor a sensor: {e}")
+        disable_parallel_measurement()
+    return parallel_measurement
+
+def disable_parallel_measurement():
+    """Elimina los callbacks de flanco de los pines ECHO."""
+    global parallel_measurement
+    
+    parallel_measurement = False
+    for name, (trig_pin, echo_pin) in sensor_pins.items():
+        try:
+            GPIO.remove_event_detect(echo_pin)
+        except Exception:
+            pass  # No estaba registrado
+
+def trigger_all(timeout=DEFAULT_ECHO_TIMEOUT):
+    """
+    Dispara todos los sensores a la vez y mide los ecos en paralelo.
+    Tarda lo que el eco más largo (como máximo timeout), no la suma de todos.
+    
+    Returns:
+        dict: Distancia en cm por compartimento (None si el sensor no respondió;
+        NEAR_OBJECT_DISTANCE_CM si ECHO subió y no bajó a tiempo, como en get_distance_cm).
+    """
+    trig_pins = [trig_pin for trig_pin, echo_pin in sensor_pins.values()]
+    with _echo_lock:
+        for trig_pin, echo_pin in sensor_pins.values():
+            _echo_edges[echo_pin] = []
+        _echo_done.clear()
+    
+    # Pulso TRIG de 10µs en todos los sensores
+    GPIO.output(trig_pins, GPIO.HIGH)
+    time.sleep(0.00001)
+    GPIO.output(trig_pins, GPIO.LOW)
+    
+    _echo_done.wait(timeout)
+    with _echo_lock:
+        edges = dict(_echo_edges)
+        for echo_pin in _echo_edges:
+            _echo_edges[echo_pin] = None  # Ignorar flancos que lleguen tarde
+    
+    distances = {}
+    for name, (trig_pin, echo_pin) in sensor_pins.items():
+        pin_edges = edges.get(echo_pin) or []
+        if len(pin_edges) == 2:
+            distances[name] = ((pin_edges[1] - pin_edges[0]) * sound_speed) / 2  # Ida y vuelta
+        elif len(pin_edges) == 1:
+            distances[name] = NEAR_OBJECT_DISTANCE_CM
+            logger.debug(f"Pulso ECHO muy largo en pin {echo_pin} (posible objeto muy cerca)")
+        else:
+            distances[name] = None
+            logger.debug(f"Sin eco completo en pin {echo_pin}")
+    return distances
+
+def get_parallel_distances(num_readings=3):
+    """
+    Mide todos los sensores a la vez num_readings veces y combina las lecturas
+    de cada uno (mediana si hay al menos 3, si no promedio).
+    
+    Returns:
+        dict: Distancia en cm por compartimento (None si todas las lecturas fallaron).
+    """
+    readings = {name: [] for name in sensor_pins}
+    for i in range(num_readings):
+        cycle_start = time.perf_counter()
+        for name, distance in trigger_all().items():
+            if distance is not None:
+                readings[name].append(distance)
+        if i < num_readings - 1:
+            time.sleep(max(0, DEFAULT_CYCLE_TIME - (time.perf_counter() - cycle_start)))
+    
+    distances = {}
+    for name, values in readings.items():
+        if len(values) >= 3:
+            distances[name] = statistics.median(values)
+        elif values:
+            distances[name] = sum(values) / len(values)
+        else:
+            distances[name] = None
+    return distances
+
 def get_avg_distance(trig_pin, echo_pin, num_readings=3):
     """
     Obtiene un promedio de múltiples lecturas de distancia para mayor precisión.
@@ -297,6 +418,8 @@ def calculate_fill_percentage(distance):
 def get_fill_levels(use_average=True, num_readings=None):
     """
     Obtiene el nivel de llenado (0-100%) para cada compartimento.
+    Con la medición en paralelo activa todos los sensores se miden a la vez;
+    si no, uno tras otro. El resultado queda también en last_levels.
     
     Args:
         use_average (bool): Si True, utiliza un promedio de varias lecturas.
@@ -305,7 +428,7 @@ def get_fill_levels(use_average=True, num_readings=None):
     Returns:
         dict: Diccionario con el porcentaje de llenado para cada compartimento.
     """
-    global fill_level_cache
+    global fill_level_cache, last_levels
     
     # Usar valor global si no se especifica
     if num_readings is None:
@@ -313,10 +436,19 @@ def get_fill_levels(use_average=True, num_readings=None):
         
     fill_levels = {}
     
+    parallel_distances = None
+    if parallel_measurement:
+        try:
+            parallel_distances = get_parallel_distances(num_readings if use_average else 1)
+        except Exception as e:
+            logger.error(f"Error en la medición en paralelo: {e}")
+    
     for name, (trig_pin, echo_pin) in sensor_pins.items():
         try:
             # Obtener distancia (simple o promediada)
-            if use_average and num_readings > 1:
+            if parallel_distances is not None:
+                distance = parallel_distances[name]
+            elif use_average and num_readings > 1:
                 distance = get_avg_distance(trig_pin, echo_pin, num_readings)
             else:
                 distance = get_distance_cm(trig_pin, echo_pin)
@@ -336,13 +468,15 @@ def get_fill_levels(use_average=True, num_readings=None):
                 else:
                     fill_levels[name] = None
                     logger.warning(f"No se pudo leer el sensor '{name}' y no hay valores en caché")
-                    
-            time.sleep(DEFAULT_READING_INTERVAL)  # Pausa entre lecturas de sensores
+            
+            if parallel_distances is None:
+                time.sleep(DEFAULT_READING_INTERVAL)  # Pausa entre lecturas de sensores
             
         except Exception as e:
             logger.error(f"Error obteniendo nivel para '{name}': {e}")
             fill_levels[name] = None
-            
+    
+    last_levels = fill_levels
     return fill_levels
 
 # --- Monitoreo Continuo ---
@@ -421,6 +555,9 @@ def cleanup_sensors():
     # Detener monitoreo si está activo
     if is_monitoring:
         stop_continuous_monitoring()
+    
+    if parallel_measurement:
+        disable_parallel_measurement()
         
     # No es necesario limpiar los pines individualmente,
     # ya que GPIO.cleanup() en main.py se ocupará de eso